@@ -1,16 +1,66 @@
-from flask import Flask, request, jsonify, send_from_directory, abort
+from flask import Flask, Request, Response, request, jsonify, send_from_directory, abort, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.utils import secure_filename
 import os
 import logging
+import tempfile
+import threading
 
 # Import actual functions for resume parsing and portfolio generation
-from core.resume_parser import parse_resume
-from core.portfolio_generator import generate_portfolio_html
+from core.resume_parser import (PARSER_CACHE_VERSION, SECTION_PARSERS, extract_resume_text, intermediates_from_json,
+                                intermediates_to_json, overlapping_sections, parse_text, replace_section_text)
+from core.portfolio_generator import fragment_cache, generate_portfolio_html, get_template_version, precompile_templates
+from core.result_cache import ResultCache, make_cache_key
+from core import nlp_provider
+from core.job_queue import JobQueue, QueueFullError, process_resume_bytes
+from core.upload_reaper import UploadReaper
+from core.static_assets import StaticAssetMiddleware, is_client_route
+from core.models import json_default
+from core.extraction_sandbox import BUSY, ExtractionError, ExtractionSandbox
+from core.admission import InFlightLimiter, RateLimiter, retry_after_header
+from core.batch import BatchTooLargeError, MAX_BATCH_FILES, iter_zip_members, process_batch
+from core import metrics
+from core.metrics import stage_timer
+import io
+import json
+import time
+import zipfile
+from functools import wraps
+
+try:
+    import orjson
+except ImportError: # Optional: responses fall back to the standard json module
+    orjson = None
 
 app = Flask(__name__, static_folder='../frontend/build', static_url_path='/')
 CORS(app) # Enable CORS for all routes
 
+class ResumeJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes core.models objects, using orjson when it is installed."""
+
+    @staticmethod
+    def default(o):
+        try:
+            return json_default(o)
+        except TypeError:
+            return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None:
+            return orjson.dumps(obj, default=self.default, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+app.json = ResumeJSONProvider(app)
+
+# --- Static assets ---
+# The React build is indexed once and served by a WSGI middleware in front of Flask, with
+# precompressed variants, immutable caching for hashed bundles and 304s; see core/static_assets.py.
+# Set STATIC_FAST_PATH=0 to fall back to serve_react_app below.
+if os.environ.get('STATIC_FAST_PATH', '1') != '0':
+    app.wsgi_app = StaticAssetMiddleware(app.wsgi_app, app.static_folder)
+
 # Configure logging
 if not app.debug:
     # In production, you might want to configure more robust logging
@@ -21,9 +71,26 @@ if not app.debug:
 app.logger.setLevel(logging.INFO)
 
 # --- Configuration for file uploads ---
-# Define the path for temporarily storing uploaded resumes
+# Uploads are parsed straight from the request stream. Files up to UPLOAD_SPOOL_MAX_SIZE stay in
+# memory; larger ones spill to an anonymous temporary file in UPLOAD_FOLDER. Requests larger than
+# MAX_CONTENT_LENGTH are rejected with 413 before the body is read.
 UPLOAD_FOLDER = 'uploads'
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH', 10 * 1024 * 1024))
+app.config['UPLOAD_SPOOL_MAX_SIZE'] = int(os.environ.get('UPLOAD_SPOOL_MAX_SIZE', 2 * 1024 * 1024))
+app.config['UPLOAD_MAX_AGE'] = float(os.environ.get('UPLOAD_MAX_AGE', 3600))
+
+class SpooledUploadRequest(Request):
+    """Request that buffers uploaded files in memory and spills to UPLOAD_FOLDER only when large."""
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(
+            max_size=app.config['UPLOAD_SPOOL_MAX_SIZE'],
+            mode='w+b',
+            prefix='upload-',
+            dir=app.config['UPLOAD_FOLDER']
+        )
+
+app.request_class = SpooledUploadRequest
 
 # Ensure the upload folder exists
 # This path will be relative to where app.py is executed from.
@@ -37,6 +104,254 @@ if not os.path.exists(UPLOAD_FOLDER):
         app.logger.error(f"Error creating upload folder {UPLOAD_FOLDER}: {e}")
         # Depending on the severity, you might want to exit or raise an exception
 
+# Nothing is saved to the upload folder on the normal path, but spilled temporary files can be
+# left behind by a crashed worker. Periodically remove anything older than UPLOAD_MAX_AGE.
+upload_reaper = UploadReaper(UPLOAD_FOLDER, max_age=app.config['UPLOAD_MAX_AGE'])
+upload_reaper.start()
+
+# --- Template precompilation ---
+# Compile all Jinja templates at import time so no request pays for parsing them
+app.logger.info(f"Precompiled {precompile_templates()} portfolio template(s)")
+
+# --- NLP model preloading ---
+# Load and warm the spaCy pipeline at import time. Under `gunicorn --preload` this happens once in
+# the master, and forked workers share the model pages copy-on-write instead of each loading it.
+if os.environ.get('NLP_PRELOAD', '1') != '0':
+    nlp_provider.preload(freeze=os.environ.get('NLP_GC_FREEZE', '1') != '0')
+    app.logger.info(f"spaCy pipeline ready in {nlp_provider.stats()['load_seconds']:.2f}s")
+
+# Concurrent uploads in a worker share one nlp.pipe call for name extraction (micro-batching): a
+# batch waits at most NLP_BATCH_MAX_WAIT_MS for more requests (0 = only those already queued).
+# NLP_MICRO_BATCH=0 runs the pipeline in each request thread instead.
+app.config['NLP_MICRO_BATCH'] = os.environ.get('NLP_MICRO_BATCH', '1') != '0'
+app.config['NLP_BATCH_MAX_WAIT_MS'] = float(os.environ.get('NLP_BATCH_MAX_WAIT_MS', 1))
+if app.config['NLP_MICRO_BATCH']:
+    nlp_provider.enable_micro_batching(max_wait=app.config['NLP_BATCH_MAX_WAIT_MS'] / 1000)
+
+# --- Configuration for the processed-result cache ---
+# Repeat uploads of the same file are answered from this cache instead of re-running the pipeline.
+# RESULT_CACHE_DIR enables the on-disk tier (survives restarts); leave it empty for memory only.
+app.config['RESULT_CACHE_SIZE'] = int(os.environ.get('RESULT_CACHE_SIZE', 128))
+app.config['RESULT_CACHE_TTL'] = float(os.environ.get('RESULT_CACHE_TTL', 3600))
+app.config['RESULT_CACHE_DIR'] = os.environ.get('RESULT_CACHE_DIR', '')
+
+result_cache = ResultCache(
+    max_entries=app.config['RESULT_CACHE_SIZE'],
+    ttl=app.config['RESULT_CACHE_TTL'],
+    disk_dir=app.config['RESULT_CACHE_DIR'] or None
+)
+# Expired entries are removed when read; this catches the ones nobody asked for again. With
+# RESULT_CACHE_TTL=0 nothing expires and the directory keeps every result ever cached.
+if app.config['RESULT_CACHE_DIR'] and app.config['RESULT_CACHE_TTL'] > 0:
+    result_cache_reaper = UploadReaper(app.config['RESULT_CACHE_DIR'], max_age=app.config['RESULT_CACHE_TTL'])
+    result_cache_reaper.start()
+
+# --- Configuration for incremental re-parsing ---
+# Intermediate results (raw text, section texts and parsed values) of recent uploads, keyed by
+# document id, so /api/reparse can redo only the sections a user edited. They default to the
+# result cache's size and lifetime, and result cache entries carry their intermediates too, so a
+# cache hit registers its document id again.
+# By default they are kept in memory, so under several server worker processes a document id is
+# only known to the worker that issued it; other workers answer 404 and the client sends the
+# full text instead (see /api/upload_resume?fields=raw_text). Setting REPARSE_CACHE_DIR shares
+# them between workers, at the cost of writing every upload's extracted text (the resume's
+# contents) to that directory on each request.
+app.config['REPARSE_CACHE_SIZE'] = int(os.environ.get('REPARSE_CACHE_SIZE', app.config['RESULT_CACHE_SIZE']))
+app.config['REPARSE_CACHE_TTL'] = float(os.environ.get('REPARSE_CACHE_TTL', app.config['RESULT_CACHE_TTL']))
+app.config['REPARSE_CACHE_DIR'] = os.environ.get('REPARSE_CACHE_DIR', '')
+
+reparse_cache = ResultCache(
+    max_entries=app.config['REPARSE_CACHE_SIZE'],
+    ttl=app.config['REPARSE_CACHE_TTL'],
+    disk_dir=app.config['REPARSE_CACHE_DIR'] or None
+)
+# Expired entries are removed when read; this catches the ones nobody asked for again
+if app.config['REPARSE_CACHE_DIR'] and app.config['REPARSE_CACHE_TTL'] > 0:
+    reparse_cache_reaper = UploadReaper(app.config['REPARSE_CACHE_DIR'], max_age=app.config['REPARSE_CACHE_TTL'])
+    reparse_cache_reaper.start()
+
+def _remember_intermediates(stored_intermediates):
+    """
+    Stores parse intermediates (intermediates_to_json output) for /api/reparse and returns the
+    document id they are kept under.
+    """
+    document_id = make_cache_key(stored_intermediates["raw_text"].encode('utf-8'), '.txt', PARSER_CACHE_VERSION)
+    reparse_cache.set(document_id, stored_intermediates)
+    return document_id
+
+# --- Configuration for the extraction sandbox ---
+# Text extraction for /api/upload_resume, /api/jobs and /api/upload_resumes runs in a pool of
+# EXTRACTION_WORKERS processes per server worker, so a malformed or hostile document cannot hang
+# or exhaust it. Each
+# document gets EXTRACTION_TIMEOUT seconds and EXTRACTION_MEMORY_LIMIT_MB of extra address space
+# (0 = no cap); workers are replaced after EXTRACTION_MAX_DOCUMENTS documents.
+# Jobs and batch uploads never take the last EXTRACTION_RESERVED_WORKERS workers, which are kept
+# for /api/upload_resume, and an upload waits at most EXTRACTION_WAIT_TIMEOUT seconds for a free
+# worker before it is answered with 503.
+# EXTRACTION_SANDBOX=0 extracts in the request worker instead.
+app.config['EXTRACTION_SANDBOX'] = os.environ.get('EXTRACTION_SANDBOX', '1') != '0'
+app.config['EXTRACTION_WORKERS'] = int(os.environ.get('EXTRACTION_WORKERS', 2))
+app.config['EXTRACTION_TIMEOUT'] = float(os.environ.get('EXTRACTION_TIMEOUT', 30))
+app.config['EXTRACTION_MEMORY_LIMIT_MB'] = int(os.environ.get('EXTRACTION_MEMORY_LIMIT_MB', 1024))
+app.config['EXTRACTION_MAX_DOCUMENTS'] = int(os.environ.get('EXTRACTION_MAX_DOCUMENTS', 100))
+app.config['EXTRACTION_RESERVED_WORKERS'] = int(os.environ.get('EXTRACTION_RESERVED_WORKERS', 1))
+app.config['EXTRACTION_WAIT_TIMEOUT'] = float(os.environ.get('EXTRACTION_WAIT_TIMEOUT', 10))
+
+extraction_sandbox = ExtractionSandbox(
+    workers=app.config['EXTRACTION_WORKERS'],
+    timeout=app.config['EXTRACTION_TIMEOUT'],
+    memory_limit_mb=app.config['EXTRACTION_MEMORY_LIMIT_MB'],
+    max_documents=app.config['EXTRACTION_MAX_DOCUMENTS'],
+    wait_timeout=app.config['EXTRACTION_WAIT_TIMEOUT'],
+    reserved_workers=app.config['EXTRACTION_RESERVED_WORKERS']
+) if app.config['EXTRACTION_SANDBOX'] else None
+# What jobs and batch uploads extract through
+background_sandbox = extraction_sandbox.background() if extraction_sandbox is not None else None
+
+# --- Configuration for the asynchronous job queue ---
+# JOB_WORKERS jobs run at once, each extracting its document in the extraction sandbox. Once
+# JOB_QUEUE_SIZE jobs are queued or running, new submissions are rejected with 429. JOB_TIMEOUT is
+# measured from submission; a job that overruns it still holds its queue slot until the sandbox
+# has stopped its extraction.
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', 2))
+app.config['JOB_QUEUE_SIZE'] = int(os.environ.get('JOB_QUEUE_SIZE', 32))
+app.config['JOB_TIMEOUT'] = float(os.environ.get('JOB_TIMEOUT', 120))
+app.config['JOB_RESULT_TTL'] = float(os.environ.get('JOB_RESULT_TTL', 600))
+# Job status is kept in JOB_STATE_DIR so that every server worker process can answer
+# GET /api/jobs/<id>, whichever worker accepted the job. Worker processes must share it; leave it
+# empty only for a single-process server.
+app.config['JOB_STATE_DIR'] = os.environ.get('JOB_STATE_DIR', os.path.join(UPLOAD_FOLDER, 'jobs'))
+
+job_queue = JobQueue(
+    max_workers=app.config['JOB_WORKERS'],
+    max_pending=app.config['JOB_QUEUE_SIZE'],
+    timeout=app.config['JOB_TIMEOUT'],
+    result_ttl=app.config['JOB_RESULT_TTL'],
+    state_dir=app.config['JOB_STATE_DIR'] or None
+)
+# Job files are removed when read after expiring; this catches the ones nobody asked for again
+if app.config['JOB_STATE_DIR']:
+    job_state_reaper = UploadReaper(app.config['JOB_STATE_DIR'],
+                                    max_age=app.config['JOB_TIMEOUT'] + app.config['JOB_RESULT_TTL'])
+    job_state_reaper.start()
+
+# --- Configuration for batch ingestion ---
+# Batch uploads are still subject to MAX_CONTENT_LENGTH; raise it for large cohort archives.
+# BATCH_WORKERS files are handled at once per request, by default one per extraction worker that
+# batches may use. Like the other pools it is per server worker process, so it is kept small
+# rather than one per core.
+app.config['BATCH_WORKERS'] = int(os.environ.get('BATCH_WORKERS', 0)) or (
+    background_sandbox.workers if background_sandbox is not None else app.config['EXTRACTION_WORKERS'])
+# Names are extracted for several finished files at once (NLP_BATCH_SIZE); a file's record is
+# streamed no later than BATCH_NER_MAX_WAIT_MS after it is parsed, even if its batch is not full.
+app.config['BATCH_NER_MAX_WAIT_MS'] = float(os.environ.get('BATCH_NER_MAX_WAIT_MS', 200))
+
+# --- Admission control for the upload routes ---
+# Each client (by remote address) gets a token bucket of ADMISSION_BURST requests refilled at
+# ADMISSION_RATE per second; beyond it requests get 429. At most ADMISSION_MAX_IN_FLIGHT upload
+# requests are processed at once, beyond which requests get 503 with Retry-After:
+# ADMISSION_RETRY_AFTER. Both limits are per server worker process; 0 disables either one.
+# Behind reverse proxies set ADMISSION_TRUST_FORWARDED to how many of them append to
+# X-Forwarded-For (usually 1). The client address is then taken that many entries from the right
+# of the header, the part the proxies wrote, so a client can't pick its own bucket by sending the
+# header itself. Leave it at 0 when clients reach the server directly.
+app.config['ADMISSION_RATE'] = float(os.environ.get('ADMISSION_RATE', 2))
+app.config['ADMISSION_BURST'] = float(os.environ.get('ADMISSION_BURST', 10))
+app.config['ADMISSION_MAX_IN_FLIGHT'] = int(os.environ.get('ADMISSION_MAX_IN_FLIGHT', 2))
+app.config['ADMISSION_RETRY_AFTER'] = float(os.environ.get('ADMISSION_RETRY_AFTER', 1))
+app.config['ADMISSION_TRUST_FORWARDED'] = int(os.environ.get('ADMISSION_TRUST_FORWARDED', 0))
+
+if app.config['ADMISSION_TRUST_FORWARDED'] > 0:
+    # Sets request.remote_addr (used for rate limiting and in the logs) from X-Forwarded-For
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['ADMISSION_TRUST_FORWARDED'])
+
+rate_limiter = RateLimiter(
+    rate=app.config['ADMISSION_RATE'],
+    burst=app.config['ADMISSION_BURST']
+) if app.config['ADMISSION_RATE'] > 0 else None
+in_flight_limiter = InFlightLimiter(app.config['ADMISSION_MAX_IN_FLIGHT']) if app.config['ADMISSION_MAX_IN_FLIGHT'] > 0 else None
+
+# --- Instrumentation ---
+# Stage timings are always recorded into /metrics. SERVER_TIMING=1 adds a Server-Timing header to
+# every response; otherwise clients can opt in per request by sending `X-Timing: 1`.
+app.config['SERVER_TIMING'] = os.environ.get('SERVER_TIMING', '0') == '1'
+
+UPLOAD_DURATION = metrics.histogram('resume_upload_duration_seconds', 'End-to-end /api/upload_resume handling time.', ['file_type', 'outcome'])
+UPLOAD_SIZE = metrics.histogram('resume_upload_size_bytes', 'Size of uploaded resume files.', ['file_type'], buckets=metrics.SIZE_BUCKETS)
+UPLOADS_TOTAL = metrics.counter('resume_uploads_total', 'Uploads handled by /api/upload_resume.', ['file_type', 'outcome'])
+metrics.gauge('resume_cache_entries', 'Entries in the in-memory result cache.').set_function(lambda: result_cache.stats()['entries'])
+metrics.gauge('resume_cache_hits', 'Result cache hits since start.').set_function(lambda: result_cache.stats()['hits'])
+metrics.gauge('resume_cache_misses', 'Result cache misses since start.').set_function(lambda: result_cache.stats()['misses'])
+metrics.gauge('resume_jobs', 'Jobs currently tracked by the job queue, by status.', ['status']).set_function(
+    lambda: {(status,): count for status, count in job_queue.stats()['jobs'].items()})
+metrics.gauge('resume_fragment_cache_hits', 'Portfolio fragment cache hits since start.').set_function(lambda: fragment_cache.stats()['hits'])
+metrics.gauge('resume_fragment_cache_misses', 'Portfolio fragment cache misses since start.').set_function(lambda: fragment_cache.stats()['misses'])
+if extraction_sandbox is not None:
+    metrics.gauge('resume_extraction_failures', 'Sandboxed extractions that failed since start, by reason.', ['reason']).set_function(
+        lambda: {(reason,): extraction_sandbox.stats()[reason] for reason in ('timeout', 'memory_limit', 'crashed', 'failed', 'busy')})
+    metrics.gauge('resume_extraction_workers_recycled', 'Extraction workers replaced after reaching EXTRACTION_MAX_DOCUMENTS.').set_function(
+        lambda: extraction_sandbox.stats()['recycled'])
+ADMISSION_REJECTIONS = metrics.counter('resume_admission_rejections_total', 'Upload requests turned away by admission control.', ['reason'])
+if in_flight_limiter is not None:
+    metrics.gauge('resume_requests_in_flight', 'Upload requests currently being processed.').set_function(lambda: in_flight_limiter.in_flight)
+metrics.gauge('resume_nlp_load_seconds', 'Time taken to load the spaCy pipeline.').set_function(lambda: nlp_provider.stats()['load_seconds'])
+
+@app.before_request
+def start_timing():
+    metrics.start_request_timing()
+    request.environ['resumespark.started'] = time.perf_counter()
+
+@app.after_request
+def add_server_timing(response):
+    if app.config['SERVER_TIMING'] or request.headers.get('X-Timing') == '1':
+        total = time.perf_counter() - request.environ.get('resumespark.started', time.perf_counter())
+        entries = metrics.server_timing_header()
+        response.headers['Server-Timing'] = (entries + ", " if entries else "") + f"total;dur={total * 1000:.1f}"
+    return response
+
+def _client_id():
+    """Identifies the client for rate limiting by its address (see ADMISSION_TRUST_FORWARDED)."""
+    return request.remote_addr or 'unknown'
+
+def admission_controlled(view):
+    """
+    Applies the per-client rate limit and the in-flight cap to an upload route.
+
+    The in-flight slot is released when the request is torn down or, for streamed responses,
+    once the server has sent the whole stream and closed the response.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if rate_limiter is not None:
+            allowed, wait = rate_limiter.acquire(_client_id())
+            if not allowed:
+                ADMISSION_REJECTIONS.inc(reason='rate_limited')
+                app.logger.warning(f"Rate limited {_client_id()} on {request.path}")
+                response = jsonify({'error': 'Too many requests. Please slow down and retry later.'})
+                response.headers['Retry-After'] = retry_after_header(wait)
+                return response, 429
+        if in_flight_limiter is None:
+            return view(*args, **kwargs)
+        if not in_flight_limiter.try_acquire():
+            ADMISSION_REJECTIONS.inc(reason='overloaded')
+            app.logger.warning(f"Rejected {request.path}: {in_flight_limiter.limit} requests already in flight")
+            response = jsonify({'error': 'The server is busy. Please retry shortly.'})
+            response.headers['Retry-After'] = retry_after_header(app.config['ADMISSION_RETRY_AFTER'])
+            return response, 503
+        request.environ['resumespark.in_flight'] = True
+        response = app.make_response(view(*args, **kwargs))
+        if response.is_streamed:
+            # The stream outlives the request; keep the slot until the server closes the response
+            request.environ.pop('resumespark.in_flight')
+            response.call_on_close(in_flight_limiter.release)
+        return response
+    return wrapper
+
+@app.teardown_request
+def release_in_flight_slot(exc):
+    if request.environ.pop('resumespark.in_flight', False):
+        in_flight_limiter.release()
+
 # Allowed resume file extensions
 ALLOWED_EXTENSIONS = {'pdf', 'docx'}
 
@@ -44,89 +359,382 @@ def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-@app.route('/api/upload_resume', methods=['POST'])
-def upload_resume_route():
-    """API endpoint to upload a resume file and get portfolio data/HTML."""
+def _get_validated_upload():
+    """
+    Validates the 'resume' file part of the current request.
+
+    Returns (file, filename, None) on success or (None, None, error_response) otherwise.
+    """
     if 'resume' not in request.files:
         app.logger.warning("Upload attempt with no 'resume' file part in request")
-        return jsonify({'error': 'No resume file part in the request'}), 400
+        return None, None, (jsonify({'error': 'No resume file part in the request'}), 400)
     
     file = request.files['resume']
     
     if file.filename == '':
         app.logger.warning("Upload attempt with no selected file (empty filename)")
-        return jsonify({'error': 'No selected file'}), 400
+        return None, None, (jsonify({'error': 'No selected file'}), 400)
     
-    if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        if not filename: # secure_filename might return an empty string for dangerous filenames
-            app.logger.warning(f"Upload attempt with an invalid/unsafe filename: {file.filename}")
-            return jsonify({'error': 'Invalid filename'}), 400
-            
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        
-        try:
-            file.save(file_path)
-            app.logger.info(f"File {filename} saved to {file_path}")
-        except Exception as e:
-            app.logger.exception(f"Error saving uploaded file {filename}: {e}")
-            return jsonify({'error': f'Error saving file: {str(e)}'}), 500
-        
-        try:
-            # Actual parsing and generation logic
-            parsed_data = parse_resume(file_path)
-            if parsed_data.get("error"):
-                app.logger.error(f"Error parsing resume {filename}: {parsed_data['error']}")
-                # Fixed syntax error in the f-string below (removed trailing quote)
-                return jsonify({'error': f'Error processing file: {parsed_data["error"]}'}), 500
-
-            portfolio_html = generate_portfolio_html(parsed_data)
+    if not (file and allowed_file(file.filename)):
+        app.logger.warning(f"Upload attempt with disallowed file type: {file.filename}")
+        return None, None, (jsonify({'error': 'File type not allowed. Please upload PDF or DOCX.'}), 400)
+
+    filename = secure_filename(file.filename)
+    if not filename: # secure_filename might return an empty string for dangerous filenames
+        app.logger.warning(f"Upload attempt with an invalid/unsafe filename: {file.filename}")
+        return None, None, (jsonify({'error': 'Invalid filename'}), 400)
+    return file, filename, None
+
+# Parts of a result a client can ask for with ?fields=, e.g. ?fields=extracted_data. Without the
+# parameter a response carries RESULT_FIELDS; raw_text (the extracted text, which /api/reparse
+# accepts in place of an expired document_id) is only sent when asked for.
+RESULT_FIELDS = ('extracted_data', 'html_content')
+OPTIONAL_RESULT_FIELDS = ('raw_text',)
+
+def _get_requested_fields():
+    """
+    Parses the comma-separated ?fields= query parameter (default: every RESULT_FIELDS entry).
+
+    Returns (fields, None) on success or (None, error_response) otherwise.
+    """
+    value = request.args.get('fields')
+    if not value:
+        return RESULT_FIELDS, None
+    known = RESULT_FIELDS + OPTIONAL_RESULT_FIELDS
+    fields = tuple(field.strip() for field in value.split(',') if field.strip())
+    unknown = [field for field in fields if field not in known]
+    if unknown or not fields:
+        return None, (jsonify({'error': f'Unknown field(s) {", ".join(unknown)}; choose from {", ".join(known)}.'}), 400)
+    return fields, None
+
+def _result_response(message, result, fields, **extra):
+    """Builds the JSON response for a processed resume with only the requested fields."""
+    body = {'message': message}
+    body.update((field, result['intermediates']['raw_text'] if field == 'raw_text' else result[field]) for field in fields)
+    body.update(extra)
+    return jsonify(body), 200
+
+@app.route('/api/upload_resume', methods=['POST'])
+@admission_controlled
+def upload_resume_route():
+    """
+    API endpoint to upload a resume file and get portfolio data/HTML.
+
+    Pass ?fields=extracted_data or ?fields=html_content to receive only that part; with
+    extracted_data alone the portfolio is not rendered at all.
+    """
+    fields, error_response = _get_requested_fields()
+    if error_response:
+        return error_response
+    file, filename, error_response = _get_validated_upload()
+    if error_response:
+        return error_response
+
+    extension = os.path.splitext(filename)[1]
+    file_type = extension.lstrip('.').lower()
+    file.stream.seek(0, os.SEEK_END)
+    file_size = file.stream.tell()
+    file.stream.seek(0)
+    started = time.perf_counter()
+    outcome = 'error'
+
+    try:
+        # Look the upload up by content hash before doing any work on it
+        with stage_timer("cache_lookup"):
+            cache_key = make_cache_key(file.stream, extension, PARSER_CACHE_VERSION, get_template_version())
+            cached_result = result_cache.get(cache_key)
+        if cached_result is not None and 'intermediates' not in cached_result:
+            # Stored by /api/jobs, without what /api/reparse needs; process the upload again
+            cached_result = None
+        if cached_result is not None and ('html_content' not in fields or 'html_content' in cached_result):
+            outcome = 'cached'
+            app.logger.info(f"Serving cached result for {filename}")
+            # The reparse cache may have dropped this document since; register it again
+            return _result_response('Resume uploaded and processed successfully.', cached_result, fields,
+                                    document_id=_remember_intermediates(cached_result['intermediates']))
+
+        if cached_result is not None:
+            # Cached by a request that only wanted extracted_data; render it now
+            result = dict(cached_result)
+        else:
+            # Actual parsing and generation logic, reading directly from the upload stream
+            try:
+                raw_text = extract_resume_text(file.stream, filename=filename, sandbox=extraction_sandbox)
+            except ExtractionError as e:
+                outcome = 'rejected'
+                app.logger.warning(f"Extraction of {filename} failed ({e.code}): {e}")
+                if e.code == BUSY:
+                    response = jsonify({'error': 'Server is busy processing other resumes. Please retry shortly.',
+                                        'error_code': e.code})
+                    response.headers['Retry-After'] = retry_after_header(app.config['ADMISSION_RETRY_AFTER'])
+                    return response, 503
+                return jsonify({'error': f'Error processing file: {e}', 'error_code': e.code}), 422
+            if not raw_text.strip():
+                app.logger.error(f"Error parsing resume {filename}: Could not extract text from resume.")
+                return jsonify({'error': 'Error processing file: Could not extract text from resume.'}), 500
+            resume, intermediates = parse_text(raw_text)
+            result = {'extracted_data': resume, 'intermediates': intermediates_to_json(intermediates)}
+
+        if 'html_content' in fields:
+            portfolio_html = generate_portfolio_html(result['extracted_data'])
             if "Error: Could not generate portfolio" in portfolio_html: # Check for known error string from generator
                  app.logger.error(f"Error generating portfolio HTML for {filename}: Template issue or rendering failed.")
                  return jsonify({'error': 'Failed to generate portfolio display from parsed data.'}), 500
+            result['html_content'] = portfolio_html
+
+        result_cache.set(cache_key, result)
+        outcome = 'processed'
+        app.logger.info(f"Successfully processed resume {filename}")
+        return _result_response('Resume uploaded and processed successfully.', result, fields,
+                                document_id=_remember_intermediates(result['intermediates']))
+    except Exception as e:
+        app.logger.exception(f"Critical error processing file {filename}: {e}")
+        return jsonify({'error': f'Error processing file: {str(e)}'}), 500
+    finally:
+        UPLOAD_DURATION.observe(time.perf_counter() - started, file_type=file_type, outcome=outcome)
+        UPLOAD_SIZE.observe(file_size, file_type=file_type)
+        UPLOADS_TOTAL.inc(file_type=file_type, outcome=outcome)
+        # Release the spooled buffer (and its temporary file, if it spilled) right away
+        file.close()
+
+@app.errorhandler(413)
+def request_too_large(e):
+    """Returns a JSON error when an upload exceeds MAX_CONTENT_LENGTH."""
+    limit_mb = app.config['MAX_CONTENT_LENGTH'] / (1024 * 1024)
+    app.logger.warning(f"Rejected upload larger than {limit_mb:.1f} MB")
+    return jsonify({'error': f'File too large. Maximum upload size is {limit_mb:.1f} MB.'}), 413
+
+@app.route('/api/reparse', methods=['POST'])
+@admission_controlled
+def reparse_route():
+    """
+    API endpoint to re-parse an edited resume without uploading the file again.
+
+    JSON body, either:
+      {"document_id": "...", "sections": {"skills": "new section text", ...}}
+        replaces the named sections of the text behind a document_id returned by
+        /api/upload_resume or an earlier /api/reparse, or
+      {"raw_text": "full edited text", "document_id": "..." (optional)}
+        parses the given text, reusing what it can from the document_id's results. The text of
+        an upload is returned by /api/upload_resume?fields=raw_text.
+
+    No text extraction is repeated; the name is re-extracted only if the header lines changed and
+    only sections whose text changed are parsed again. Returns the updated extracted_data and
+    html_content (or only one of them, see ?fields=), with the new document_id for further edits.
+    """
+    fields, error_response = _get_requested_fields()
+    if error_response:
+        return error_response
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Expected a JSON object.'}), 400
+
+    document_id = payload.get('document_id')
+    stored = reparse_cache.get(document_id) if isinstance(document_id, str) and document_id else None
+    previous = intermediates_from_json(stored) if stored is not None else None
+    raw_text = payload.get('raw_text')
+    sections = payload.get('sections')
+
+    if raw_text is None:
+        if not sections or not isinstance(sections, dict):
+            return jsonify({'error': "Provide 'raw_text', or 'document_id' with 'sections'."}), 400
+        if previous is None:
+            return jsonify({'error': 'Unknown or expired document_id. Send the full raw_text instead '
+                                     '(see /api/upload_resume?fields=raw_text).'}), 404
+        unknown = [name for name in sections if name not in SECTION_PARSERS]
+        if unknown:
+            return jsonify({'error': f'Unknown section(s): {", ".join(unknown)}.'}), 400
+        not_text = [name for name, value in sections.items() if not isinstance(value, str)]
+        if not_text:
+            return jsonify({'error': f'Section text must be a string: {", ".join(not_text)}.'}), 400
+        spans = previous["spans"]
+        missing = [name for name in sections if name not in {span[0] for span in spans}]
+        if missing:
+            return jsonify({'error': f'Section(s) without a heading in this resume: {", ".join(missing)}.'}), 400
+        overlapping = overlapping_sections(spans, sections)
+        if overlapping:
+            return jsonify({'error': f'Sections {", ".join(overlapping)} overlap in this resume; edit them in '
+                                     'separate requests or send the full raw_text.'}), 400
+        raw_text = previous["raw_text"]
+        # Replace from the last section backwards so earlier spans stay valid
+        for name, _, _ in sorted((span for span in spans if span[0] in sections), key=lambda span: span[1], reverse=True):
+            raw_text = replace_section_text(raw_text, spans, name, sections[name])
+
+    if not isinstance(raw_text, str) or not raw_text.strip():
+        return jsonify({'error': "'raw_text' must be a non-empty string."}), 400
+
+    try:
+        resume, intermediates = parse_text(raw_text, previous=previous)
+        result = {'extracted_data': resume, 'intermediates': intermediates}
+        if 'html_content' in fields:
+            result['html_content'] = generate_portfolio_html(resume)
+            if "Error: Could not generate portfolio" in result['html_content']:
+                app.logger.error("Error generating portfolio HTML for a re-parse")
+                return jsonify({'error': 'Failed to generate portfolio display from parsed data.'}), 500
+    except Exception as e:
+        app.logger.exception(f"Critical error re-parsing document: {e}")
+        return jsonify({'error': f'Error re-parsing resume: {str(e)}'}), 500
 
-            app.logger.info(f"Successfully processed resume {filename}")
-            return jsonify({
-                'message': 'Resume uploaded and processed successfully.',
-                'html_content': portfolio_html, 
-                'extracted_data': parsed_data
-            }), 200
-        except Exception as e:
-            app.logger.exception(f"Critical error processing file {filename} after saving: {e}")
-            return jsonify({'error': f'Error processing file: {str(e)}'}), 500
-        finally:
-            # Clean up the uploaded file if desired, or keep for debugging.
-            # For now, we keep it. Consider a cleanup strategy for production.
-            # For example, a periodic task to remove old files.
-            # if os.path.exists(file_path):
-            #     try:
-            #         os.remove(file_path)
-            #         app.logger.info(f"Cleaned up uploaded file: {file_path}")
-            #     except OSError as e:
-            #         app.logger.error(f"Error removing uploaded file {file_path}: {e}")
-            pass
-            
-    app.logger.warning(f"Upload attempt with disallowed file type: {file.filename}")
-    return jsonify({'error': 'File type not allowed. Please upload PDF or DOCX.'}), 400
+    app.logger.info(f"Re-parsed sections {intermediates['reparsed_sections']}"
+                    f"{' and name' if intermediates['name_reextracted'] else ''}")
+    return _result_response('Resume re-parsed successfully.', result, fields,
+                            document_id=_remember_intermediates(intermediates_to_json(intermediates)),
+                            reparsed_sections=intermediates['reparsed_sections'],
+                            name_reextracted=intermediates['name_reextracted'])
+
+@app.route('/api/jobs', methods=['POST'])
+@admission_controlled
+def create_job_route():
+    """API endpoint to queue a resume for background processing. Returns a job id immediately."""
+    file, filename, error_response = _get_validated_upload()
+    if error_response:
+        return error_response
+
+    file_bytes = file.read()
+    extension = os.path.splitext(filename)[1]
+    cache_key = make_cache_key(file_bytes, extension, PARSER_CACHE_VERSION, get_template_version())
+    cached_result = result_cache.get(cache_key)
+    # Entries cached by /api/upload_resume?fields=extracted_data have no portfolio; run the job then
+    if cached_result is not None and 'html_content' in cached_result:
+        # Only the parts a job reports, not the upload route's reparse intermediates
+        job_id = job_queue.add_completed({field: cached_result[field] for field in RESULT_FIELDS})
+        app.logger.info(f"Job {job_id} for {filename} served from cache")
+        return jsonify({'job_id': job_id, 'status': 'done'}), 202
+
+    # The bytes are kept until the job runs; MAX_CONTENT_LENGTH bounds their size
+    try:
+        job_id = job_queue.submit(process_resume_bytes, file_bytes, filename, background_sandbox,
+                                  on_result=lambda result: result_cache.set(cache_key, result))
+    except QueueFullError as e:
+        app.logger.warning(f"Rejected job for {filename}: {e}")
+        response = jsonify({'error': 'Server is busy processing other resumes. Please retry shortly.'})
+        response.headers['Retry-After'] = '5'
+        return response, 429
+
+    app.logger.info(f"Queued job {job_id} for {filename}")
+    return jsonify({'job_id': job_id, 'status': 'queued'}), 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_route(job_id):
+    """API endpoint returning the status of a queued job, and its results once done."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found or expired.'}), 404
+    return jsonify(job), 200
+
+@app.route('/api/upload_resumes', methods=['POST'])
+@admission_controlled
+def upload_resumes_route():
+    """
+    API endpoint for batch ingestion.
+
+    Accepts either a zip archive in the 'archive' file part or several files in 'resumes'.
+    Streams back NDJSON, one record per resume as soon as it is parsed. Pass ?include_html=1
+    to also render each portfolio. Per-file failures appear as records with an 'error' key.
+    """
+    include_html = request.args.get('include_html') in ('1', 'true')
+
+    if 'archive' in request.files:
+        archive = request.files['archive']
+        archive_bytes = archive.read()
+        if not zipfile.is_zipfile(io.BytesIO(archive_bytes)):
+            app.logger.warning(f"Batch upload with a non-zip archive: {archive.filename}")
+            return jsonify({'error': 'Archive must be a .zip file.'}), 400
+        try:
+            # Size/count limits are checked here, before streaming starts; members are then
+            # decompressed one at a time as process_batch takes them
+            items = iter_zip_members(archive_bytes)
+        except (BatchTooLargeError, zipfile.BadZipFile) as e:
+            app.logger.warning(f"Rejected batch archive {archive.filename}: {e}")
+            return jsonify({'error': str(e)}), 400
+        invalid_names = []
+        app.logger.info(f"Processing batch archive {archive.filename}")
+    else:
+        files = request.files.getlist('resumes')
+        if not files:
+            app.logger.warning("Batch upload with neither an 'archive' nor 'resumes' file part")
+            return jsonify({'error': "Provide a zip in 'archive' or files in 'resumes'."}), 400
+        if len(files) > MAX_BATCH_FILES:
+            return jsonify({'error': f'Too many files; the limit is {MAX_BATCH_FILES}.'}), 400
+        items = []
+        for file in files:
+            filename = secure_filename(file.filename or '')
+            if not filename or not allowed_file(filename):
+                # Report invalid entries in the stream instead of failing the whole batch
+                items.append((file.filename or '', None))
+            else:
+                items.append((filename, file.read()))
+        invalid_names = [name for name, data in items if data is None]
+        items = [(name, data) for name, data in items if data is not None]
+        app.logger.info(f"Processing batch of {len(items)} resume(s)")
+
+    def generate():
+        for name in invalid_names:
+            yield json.dumps({'file': name, 'error': 'File type not allowed. Please upload PDF or DOCX.'}) + "\n"
+        for record in process_batch(items, max_workers=app.config['BATCH_WORKERS'], include_html=include_html,
+                                    sandbox=background_sandbox,
+                                    ner_max_wait=app.config['BATCH_NER_MAX_WAIT_MS'] / 1000):
+            yield json.dumps(record, default=json_default) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/metrics', methods=['GET'])
+def metrics_route():
+    """Exposes process metrics in the Prometheus text exposition format."""
+    return Response(metrics.REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/cache_stats', methods=['GET'])
+def cache_stats_route():
+    """API endpoint reporting hit/miss counters for the processed-result cache."""
+    return jsonify(result_cache.stats()), 200
+
+@app.route('/api/nlp_stats', methods=['GET'])
+def nlp_stats_route():
+    """API endpoint reporting spaCy load time and per-call latency."""
+    return jsonify(nlp_provider.stats()), 200
+
+# Background warm-up started by the readiness probe when the model wasn't preloaded (NLP_PRELOAD=0).
+# Keyed by pid so each forked worker warms its own copy.
+_warm_up_lock = threading.Lock()
+_warm_up_pid = None
+
+@app.route('/api/ready', methods=['GET'])
+def readiness_route():
+    """
+    Readiness probe: 200 once the spaCy pipeline is loaded and warm, 503 until then.
+
+    Load balancers should only route uploads to a worker after this succeeds, so no request pays
+    for model loading.
+    """
+    global _warm_up_pid
+    if nlp_provider.is_ready():
+        return jsonify({'ready': True, 'pid': os.getpid()}), 200
+    with _warm_up_lock:
+        if _warm_up_pid != os.getpid():
+            _warm_up_pid = os.getpid()
+            threading.Thread(target=nlp_provider.warm_up, name='nlp-warm-up', daemon=True).start()
+    response = jsonify({'ready': False, 'pid': os.getpid()})
+    response.headers['Retry-After'] = '1'
+    return response, 503
 
 # --- Serve React App ---
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve_react_app(path):
-    """Serves the main index.html for the React app and its static assets."""
+    """
+    Serves the main index.html for the React app and its static assets.
+
+    Only reached when StaticAssetMiddleware is disabled or the build was missing at startup.
+    """
     if path != "" and os.path.exists(os.path.join(app.static_folder, path)):
         # If the path points to an existing file in the static folder, serve it.
         return send_from_directory(app.static_folder, path)
-    elif path == "favicon.ico": 
-        # Explicitly handle favicon.ico if not caught by the above (e.g., if it's at the root)
-        favicon_path = os.path.join(app.static_folder, 'favicon.ico')
-        if os.path.exists(favicon_path):
-            return send_from_directory(app.static_folder, 'favicon.ico')
-        else:
-            app.logger.debug("Favicon.ico not found in static folder.")
-            abort(404) 
+    elif not is_client_route(path):
+        # A missing file (favicon.ico, a bundle from an older build) is not a client-side route
+        app.logger.debug(f"{path} not found in static folder.")
+        abort(404)
     else:
-        # Serve index.html for any route not matching a static file (client-side routing)
+        # Serve index.html for any extensionless route not matching a static file (client-side routing)
         # Also serves index.html for the root path '/' when path is ''.
         index_html_path = os.path.join(app.static_folder, 'index.html')
         if not os.path.exists(index_html_path):
@@ -137,5 +745,6 @@ def serve_react_app(path):
 if __name__ == '__main__':
     # The port is set to 9000 as per requirements.
     # Host '0.0.0.0' makes it accessible from any network interface.
-    # debug=True is suitable for development. Ensure it's False in production if not using a production WSGI server.
+    # debug=True is suitable for development only. In production run gunicorn with gunicorn.conf.py
+    # (see startup.sh), which preloads the app and serves it from several worker processes.
     app.run(host='0.0.0.0', port=9000, debug=True)
@@ -0,0 +1,68 @@
+"""
+Contact extraction micro-benchmark on adversarial text.
+
+Times the original five-pattern extraction (raw pattern strings, reproduced below) against the
+single-pass CONTACT_REGEX scanner in _extract_contact_info, on inputs that make backtracking
+patterns go quadratic: digit tables, long tokens without an '@', '@'-heavy text, plus a normal
+resume for reference. Sizes double each row so the growth rate is visible.
+
+Run from the backend directory:
+    python -m benchmarks.contact_benchmark [--sizes 1000 2000 4000] [--repeat N]
+"""
+import argparse
+import re
+import time
+
+from core import resume_parser
+from benchmarks.synthetic import resume_lines
+
+# The patterns _extract_contact_info used before the single-pass scanner
+LEGACY_PATTERNS = [
+    r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}",
+    r"(?:\+?\d{1,3}[-\s\(\)]?)?(?:\d{2,4}[-\s\(\)]?){2,}\d{3,4}",
+    r"linkedin\.com/in/(\w[-_\w]*)",
+    r"github\.com/(\w[-_\w]*)",
+    r"https?://(?:www\.)?([a-zA-Z0-9-]+(?:\.[a-zA-Z]+)+)(?:/[^\s]*)?",
+]
+
+ADVERSARIAL_INPUTS = {
+    # name: builds a text of roughly `n` characters
+    "digit table": lambda n: "12 " * (n // 3),
+    "dashed digits": lambda n: "12-" * (n // 3) + "x",
+    "token without @": lambda n: "a" * n,
+    "@ then dashes": lambda n: "a@" + "a-" * (n // 2),
+    "resume": lambda n: "\n".join(resume_lines(pages=20))[:n],
+}
+
+
+def _legacy_extract(text):
+    for pattern in LEGACY_PATTERNS:
+        re.findall(pattern, text, re.IGNORECASE)
+
+
+def _time(fn, text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 4000, 8000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'input':18s} {'chars':>7s} {'legacy ms':>10s} {'scanner ms':>11s} {'speedup':>8s}")
+    for name, build in ADVERSARIAL_INPUTS.items():
+        for size in args.sizes:
+            text = build(size)
+            legacy_ms = _time(_legacy_extract, text, args.repeat)
+            scanner_ms = _time(resume_parser._extract_contact_info, text, args.repeat)
+            print(f"{name:18s} {len(text):7d} {legacy_ms:10.2f} {scanner_ms:11.2f} {legacy_ms / max(scanner_ms, 1e-6):7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
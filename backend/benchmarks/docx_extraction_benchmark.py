@@ -0,0 +1,113 @@
+"""
+DOCX extraction benchmark: 'python-docx' vs 'stream' DOCX_EXTRACTION_MODE.
+
+Generates synthetic DOCX resumes (1-100 pages, with and without tables for the contact details
+and skills, and with floating text boxes) and reports, per mode, the extraction time, the peak
+memory the extraction added to the process, and how complete the text is: characters, plus the
+skills and contact fields the parser finds in it. Documents without tables must give identical
+text in both modes; the exit status is 1 if any does not.
+
+Memory is measured as the growth of the peak RSS in a fresh (spawned) process doing one extraction,
+because python-docx allocates its lxml tree outside the Python allocator that tracemalloc sees.
+
+Run from the backend directory:
+    python -m benchmarks.docx_extraction_benchmark [--repeat N]
+"""
+import argparse
+import io
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+
+from core import resume_parser
+from core.models import Resume
+from benchmarks.synthetic import make_resume
+
+MODES = ("python-docx", "stream")
+CORPUS = [
+    # (label, pages, tables, text box style)
+    ("1 page", 1, False, ""),
+    ("20 pages", 20, False, ""),
+    ("100 pages", 100, False, ""),
+    ("1 page + tables", 1, True, ""),
+    ("20 pages + tables", 20, True, ""),
+    ("1 page + drawing", 1, False, "drawing"),
+    ("1 page + mc:Alt", 1, False, "alternate_content"),
+    ("20 pages + mc:Alt", 20, False, "alternate_content"),
+]
+CONTACT_FIELDS = ("email", "phone", "linkedin", "github", "website")
+_DEFAULTS = Resume("")
+
+
+def _time_extraction(docx_bytes, mode, repeat):
+    timings = []
+    text = ""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        text = resume_parser._extract_text_from_docx(io.BytesIO(docx_bytes), mode=mode)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), text
+
+
+def _peak_rss_kb():
+    # VmHWM belongs to the process image, unlike ru_maxrss, which survives the exec of a spawn
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _measure_rss(docx_bytes, mode, results):
+    before = _peak_rss_kb()
+    resume_parser._extract_text_from_docx(io.BytesIO(docx_bytes), mode=mode)
+    results.put(_peak_rss_kb() - before)
+
+
+def _peak_rss_growth_mb(docx_bytes, mode):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    child = context.Process(target=_measure_rss, args=(docx_bytes, mode, results))
+    child.start()
+    growth_kb = results.get()
+    child.join()
+    return growth_kb / 1024
+
+
+def _completeness(text):
+    resume, _ = resume_parser.parse_text(text, name="")
+    contact = sum(1 for field in CONTACT_FIELDS if resume[field] != _DEFAULTS[field])
+    return len(text), len(resume.skills), contact
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'document':18s} {'mode':12s} {'ms':>8s} {'speedup':>8s} {'peak MB':>8s} {'chars':>8s} {'skills':>7s} {'contact':>8s}")
+    mismatches = []
+    for label, pages, tables, text_box in CORPUS:
+        docx_bytes = make_resume('docx', pages=pages, seed=pages, tables=tables, text_box=text_box)
+        baseline_ms = None
+        texts = {}
+        for mode in MODES:
+            elapsed_ms, texts[mode] = _time_extraction(docx_bytes, mode, args.repeat)
+            baseline_ms = baseline_ms or elapsed_ms
+            chars, skills, contact = _completeness(texts[mode])
+            print(f"{label:18s} {mode:12s} {elapsed_ms:8.1f} {baseline_ms / max(elapsed_ms, 1e-6):7.1f}x "
+                  f"{_peak_rss_growth_mb(docx_bytes, mode):8.1f} {chars:8d} {skills:7d} {contact:5d}/{len(CONTACT_FIELDS)}")
+        if not tables and len(set(texts.values())) > 1:
+            mismatches.append(label)
+    for label in mismatches:
+        print(f"MISMATCH: '{label}' extracts differently in the two modes")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+Load generator for POST /api/upload_resume.
+
+Replays a corpus of resumes against a running server at a fixed arrival rate (open loop) or as
+fast as `--concurrency` connections allow (closed loop, --rate 0), and reports latency
+percentiles, throughput, status codes and error rates, including the 429/503 responses of the
+server's admission control.
+
+In open-loop mode latency is measured from the moment a request was due, so time spent waiting
+for a free connection when the server falls behind counts against it instead of silently
+lowering the offered load.
+
+The corpus is every PDF/DOCX file in --corpus, or --synthetic N generated resumes. Repeated
+files are answered from the server's result cache; use a corpus at least as large as the number
+of requests (or RESULT_CACHE_SIZE=0 on the server) to measure parsing.
+
+Run from the backend directory against a started server:
+    python -m benchmarks.load_test --url http://127.0.0.1:9000 --rate 20 --concurrency 8 --duration 30
+    python -m benchmarks.load_test --corpus path/to/resumes --rate 0 --concurrency 16 --requests 500
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from benchmarks.pipeline_benchmark import percentile
+from benchmarks.synthetic import LAYOUTS, make_resume
+
+CONTENT_TYPES = {'.pdf': 'application/pdf',
+                 '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'}
+
+
+def encode_upload(filename: str, data: bytes):
+    """Returns (body, content type) of a multipart/form-data upload in the 'resume' field."""
+    boundary = uuid.uuid4().hex
+    content_type = CONTENT_TYPES.get(os.path.splitext(filename)[1].lower(), 'application/octet-stream')
+    body = (f'--{boundary}\r\nContent-Disposition: form-data; name="resume"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n').encode('utf-8') + data + f'\r\n--{boundary}--\r\n'.encode('utf-8')
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+def load_corpus(directory: Optional[str], synthetic: int) -> List[Dict]:
+    """Reads every PDF/DOCX under `directory`, or generates `synthetic` varied resumes."""
+    documents = []
+    if directory:
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() in CONTENT_TYPES:
+                    with open(os.path.join(root, name), 'rb') as f:
+                        documents.append({'name': name, 'bytes': f.read()})
+    else:
+        layouts = list(LAYOUTS)
+        for i in range(synthetic):
+            file_type = 'pdf' if i % 2 else 'docx'
+            data = make_resume(file_type, pages=1 + i % 5, layout=layouts[i % len(layouts)], seed=i)
+            documents.append({'name': f'synthetic-{i}.{file_type}', 'bytes': data})
+    for doc in documents:
+        doc['body'], doc['content_type'] = encode_upload(doc['name'], doc['bytes'])
+    return documents
+
+
+class _Connection:
+    """One keep-alive HTTP connection, reopened after errors."""
+
+    def __init__(self, url: str, timeout: float):
+        parts = urlsplit(url)
+        self.host = parts.netloc
+        self.https = parts.scheme == 'https'
+        self.timeout = timeout
+        self.conn = None
+
+    def post(self, path: str, body: bytes, headers: Dict[str, str]):
+        reused = self.conn is not None
+        if self.conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            self.conn = cls(self.host, timeout=self.timeout)
+        try:
+            self.conn.request('POST', path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            response.read()
+            if response.getheader('Connection', '').lower() == 'close':
+                self.close()
+            return response.status
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            self.close()
+            if not reused:
+                raise
+            # The server closed an idle keep-alive connection; retry once on a new one
+            return self.post(path, body, headers)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def run_load(url: str, path: str, corpus: List[Dict], rate: float, concurrency: int, duration: float,
+             max_requests: int, clients: int, timeout: float) -> List[Dict]:
+    """
+    Sends requests until `duration` seconds have passed or `max_requests` were sent (0 = no limit
+    for either, but not both) and returns one record per request.
+
+    With `clients` > 0, requests carry one of that many X-Forwarded-For addresses in turn, to
+    exercise per-client rate limits on a server started with ADMISSION_TRUST_FORWARDED=1 and
+    reached directly, so the load generator stands in for the one trusted proxy.
+    """
+    documents = itertools.cycle(corpus)
+    addresses = itertools.cycle([f'10.0.{i // 256}.{i % 256}' for i in range(clients)]) if clients > 0 else None
+    records: List[Dict] = []
+    lock = threading.Lock()
+    work: "queue.Queue" = queue.Queue()
+    started = time.perf_counter()
+    deadline = started + duration if duration > 0 else float('inf')
+
+    def worker():
+        connection = _Connection(url, timeout)
+        while True:
+            item = work.get()
+            if item is None:
+                connection.close()
+                return
+            due, doc, address = item
+            headers = {'Content-Type': doc['content_type']}
+            if address:
+                headers['X-Forwarded-For'] = address
+            sent = time.perf_counter()
+            try:
+                status, error = connection.post(path, doc['body'], headers), None
+            except Exception as e:
+                status, error = None, f'{type(e).__name__}: {e}'
+            finished = time.perf_counter()
+            with lock:
+                records.append({'status': status, 'error': error, 'latency': finished - (due if rate > 0 else sent),
+                                'service_time': finished - sent})
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+
+    for sent in itertools.count():
+        if max_requests and sent >= max_requests:
+            break
+        if rate > 0:
+            due = started + sent / rate
+            now = time.perf_counter()
+            if due >= deadline:
+                break
+            if due > now:
+                time.sleep(due - now)
+        else:
+            # Closed loop: keep every connection busy without queueing ahead
+            while work.qsize() >= concurrency:
+                time.sleep(0.001)
+            due = time.perf_counter()
+            if due >= deadline:
+                break
+        work.put((due, next(documents), next(addresses) if addresses else None))
+
+    for _ in threads:
+        work.put(None)
+    for thread in threads:
+        thread.join()
+    return records
+
+
+def summarize_load(records: List[Dict], elapsed: float) -> Dict:
+    """Aggregates request records into status counts, error rates, throughput and percentiles."""
+    statuses: Dict[str, int] = {}
+    for record in records:
+        key = str(record['status']) if record['status'] is not None else 'transport_error'
+        statuses[key] = statuses.get(key, 0) + 1
+    total = len(records)
+    ok = [r for r in records if r['status'] is not None and 200 <= r['status'] < 300]
+
+    def latencies(selected):
+        values = sorted(r['latency'] * 1000 for r in selected)
+        return {
+            'n': len(values),
+            'p50_ms': percentile(values, 0.50),
+            'p90_ms': percentile(values, 0.90),
+            'p95_ms': percentile(values, 0.95),
+            'p99_ms': percentile(values, 0.99),
+            'max_ms': values[-1] if values else 0.0,
+        }
+
+    return {
+        'requests': total,
+        'elapsed_s': elapsed,
+        'throughput_per_s': total / elapsed if elapsed else 0.0,
+        'goodput_per_s': len(ok) / elapsed if elapsed else 0.0,
+        'statuses': dict(sorted(statuses.items())),
+        'error_rate': (total - len(ok)) / total if total else 0.0,
+        'rate_limited_rate': statuses.get('429', 0) / total if total else 0.0,
+        'overloaded_rate': statuses.get('503', 0) / total if total else 0.0,
+        'latency_all': latencies(records),
+        'latency_ok': latencies(ok),
+        'sample_errors': sorted({r['error'] for r in records if r['error']})[:5],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:9000", help="Server base URL")
+    parser.add_argument("--path", default="/api/upload_resume", help="Endpoint, with any query string (e.g. ?fields=extracted_data)")
+    parser.add_argument("--corpus", default=None, help="Directory of PDF/DOCX resumes to replay")
+    parser.add_argument("--synthetic", type=int, default=20, help="Number of generated resumes when no --corpus is given")
+    parser.add_argument("--rate", type=float, default=10, help="Arrivals per second (0 = closed loop)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Connections sending in parallel")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to send for (0 = until --requests)")
+    parser.add_argument("--requests", type=int, default=0, help="Stop after this many requests (0 = until --duration)")
+    parser.add_argument("--clients", type=int, default=0, help="Spread requests over this many X-Forwarded-For addresses")
+    parser.add_argument("--timeout", type=float, default=120, help="Per-request timeout in seconds")
+    parser.add_argument("--output", default=None, help="Write the summary JSON to this path")
+    args = parser.parse_args(argv)
+    if args.duration <= 0 and args.requests <= 0:
+        parser.error("give a --duration or a number of --requests")
+
+    corpus = load_corpus(args.corpus, args.synthetic)
+    if not corpus:
+        parser.error("the corpus is empty")
+    mode = f"{args.rate:g} req/s" if args.rate > 0 else "closed loop"
+    print(f"Replaying {len(corpus)} document(s) against {args.url}{args.path}: {mode}, "
+          f"{args.concurrency} connection(s)", file=sys.stderr)
+
+    started = time.perf_counter()
+    records = run_load(args.url.rstrip('/'), args.path, corpus, args.rate, max(1, args.concurrency),
+                       args.duration, args.requests, args.clients, args.timeout)
+    summary = summarize_load(records, time.perf_counter() - started)
+    summary['config'] = {k: v for k, v in vars(args).items() if k != 'output'}
+
+    print(f"requests {summary['requests']}  throughput {summary['throughput_per_s']:.1f}/s  "
+          f"goodput {summary['goodput_per_s']:.1f}/s  errors {summary['error_rate']:.1%}  "
+          f"(429 {summary['rate_limited_rate']:.1%}, 503 {summary['overloaded_rate']:.1%})")
+    print(f"statuses {summary['statuses']}")
+    for label in ('latency_all', 'latency_ok'):
+        stats = summary[label]
+        print(f"{label:12s} n={stats['n']:<6d} p50 {stats['p50_ms']:8.1f} ms  p90 {stats['p90_ms']:8.1f} ms  "
+              f"p95 {stats['p95_ms']:8.1f} ms  p99 {stats['p99_ms']:8.1f} ms  max {stats['max_ms']:8.1f} ms")
+    for error in summary['sample_errors']:
+        print(f"  error: {error}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Name extraction throughput: per-document NER against batched nlp.pipe.
+
+Times _extract_name on one header at a time (the original path), extract_names at several
+batch sizes, and the online micro-batcher with concurrent callers, and checks that every
+variant returns exactly the names of the per-document path. Reports docs/sec.
+
+Uses the model in SPACY_MODEL (falls back to a no-op pipeline if it is not installed, which makes
+the numbers meaningless). Run from the backend directory:
+    python -m benchmarks.ner_benchmark [--docs N] [--batch-sizes 8 32 128] [--processes N] [--threads N]
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+
+from core import nlp_provider, resume_parser
+from benchmarks.synthetic import resume_lines
+
+_FIRST_NAMES = ["Jane", "Rahul", "Maria", "Wei", "Olusegun", "Anna", "Carlos", "Yuki", "Fatima", "Liam"]
+_LAST_NAMES = ["Doe", "Sharma", "Garcia", "Zhang", "Adeyemi", "Kowalski", "Silva", "Tanaka", "Khan", "Murphy"]
+
+
+def make_headers(count, seed=0):
+    """Header snippets (name_candidate_text) of `count` synthetic resumes with varied names."""
+    rng = random.Random(seed)
+    lines = resume_lines(pages=1)
+    headers = []
+    for _ in range(count):
+        name = f"{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}"
+        headers.append(resume_parser.name_candidate_text("\n".join([name] + lines[1:])))
+    return headers
+
+
+def _per_document(headers):
+    return [resume_parser._extract_name(header) for header in headers]
+
+
+def _micro_batched(headers, threads):
+    names = [None] * len(headers)
+    chunks = [range(i, len(headers), threads) for i in range(threads)]
+
+    def worker(indexes):
+        for i in indexes:
+            names[i] = resume_parser._extract_name(headers[i])
+
+    workers = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return names
+
+
+def _time(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--processes", type=int, default=1, help="n_process for the nlp.pipe rows")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent callers for the micro-batching row")
+    parser.add_argument("--max-wait-ms", type=float, default=1)
+    args = parser.parse_args()
+
+    headers = make_headers(args.docs)
+    nlp_provider.warm_up()
+    print(f"model: {nlp_provider.stats()['model']}  pipeline: {nlp_provider.stats()['pipeline']}  docs: {len(headers)}")
+
+    elapsed, expected = _time(lambda: _per_document(headers))
+    rows = [("per document (nlp(text))", elapsed, True)]
+    for batch_size in args.batch_sizes:
+        elapsed, names = _time(lambda: resume_parser.extract_names(headers, batch_size=batch_size, n_process=args.processes))
+        rows.append((f"nlp.pipe batch_size={batch_size} n_process={args.processes}", elapsed, names == expected))
+
+    nlp_provider.enable_micro_batching(max_wait=args.max_wait_ms / 1000, batch_size=max(args.batch_sizes))
+    try:
+        elapsed, names = _time(lambda: _micro_batched(headers, args.threads))
+    finally:
+        nlp_provider.disable_micro_batching()
+    rows.append((f"micro-batched, {args.threads} threads, {args.max_wait_ms:g} ms wait", elapsed, names == expected))
+
+    print(f"{'variant':48s} {'docs/sec':>10s} {'speedup':>8s} {'identical':>10s}")
+    baseline = rows[0][1]
+    for label, elapsed, identical in rows:
+        print(f"{label:48s} {len(headers) / elapsed:10.0f} {baseline / elapsed:7.2f}x {'yes' if identical else 'NO':>10s}")
+    return 0 if all(identical for _, _, identical in rows) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
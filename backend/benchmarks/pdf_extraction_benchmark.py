@@ -0,0 +1,80 @@
+"""
+PDF extraction benchmark: the cost of pdfminer extraction and what a PDF_MAX_PAGES cap saves.
+
+Generates a synthetic corpus (1-20 pages, with logos on text pages, with appended scanned
+pages, in two columns, and with the longest section last so it runs to the end), extracts each
+document in full and with a page cap, and reports the time taken and how much of the full
+output the capped extraction kept: characters, sections plus entries found by the parser, and
+whether the sections come out in the same order. Whatever lies past the cap is lost, so the
+'kept' columns show what a given cap costs on long documents.
+
+Run from the backend directory:
+    python -m benchmarks.pdf_extraction_benchmark [--repeat N] [--max-pages N]
+"""
+import argparse
+import io
+import statistics
+import time
+
+from core import resume_parser
+from benchmarks.synthetic import make_resume
+
+CORPUS = [
+    # (label, pages, images_per_page, scanned_pages, columns, layout)
+    ("1 page", 1, 0, 0, 1, "standard"),
+    ("5 pages", 5, 0, 0, 1, "standard"),
+    ("10 pages", 10, 0, 0, 1, "standard"),
+    ("20 pages", 20, 0, 0, 1, "standard"),
+    ("5 pages + logos", 5, 4, 0, 1, "standard"),
+    ("2 pages + 8 scans", 2, 0, 8, 1, "standard"),
+    ("20 pages + 10 scans", 20, 2, 10, 1, "standard"),
+    ("1 page, 2 columns", 1, 0, 0, 2, "standard"),
+    ("10 pages, 2 columns", 10, 0, 0, 2, "standard"),
+    ("5 pages, long last", 5, 0, 0, 1, "experience_last"),
+    ("20 pages, long last", 20, 0, 0, 1, "experience_last"),
+]
+
+
+def _time_extraction(pdf_bytes, repeat, max_pages=0):
+    timings = []
+    text = ""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        text = resume_parser._extract_text_from_pdf(io.BytesIO(pdf_bytes), max_pages=max_pages)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), text
+
+
+def _entry_count(text):
+    sections = resume_parser._segment_sections(text)
+    experience = resume_parser._parse_experience(resume_parser._section_text(text, sections, "experience"))
+    return len(sections) + len(experience)
+
+
+def _section_order(text):
+    return [span[0] for span in resume_parser._segment_sections(text)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-pages", type=int, default=5, help="Page cap for the 'capped' columns")
+    args = parser.parse_args()
+
+    print(f"{'document':20s} {'full ms':>9s} {'capped ms':>10s} {'speedup':>8s} {'chars kept':>11s} {'entries kept':>13s}"
+          f" {'order':>6s}")
+    for label, pages, images, scans, columns, layout in CORPUS:
+        pdf_bytes = make_resume('pdf', pages=pages, layout=layout, images_per_page=images, scanned_pages=scans,
+                                seed=pages, columns=columns)
+        full_ms, full_text = _time_extraction(pdf_bytes, args.repeat)
+        capped_ms, capped_text = _time_extraction(pdf_bytes, args.repeat, max_pages=args.max_pages)
+        chars_kept = len(capped_text) / len(full_text) if full_text else 1.0
+        full_entries = _entry_count(full_text)
+        entries_kept = _entry_count(capped_text) / full_entries if full_entries else 1.0
+        same_order = _section_order(capped_text) == _section_order(full_text)
+        print(f"{label:20s} {full_ms:9.1f} {capped_ms:10.1f} {full_ms / max(capped_ms, 1e-6):7.1f}x "
+              f"{chars_kept:10.0%} {entries_kept:12.0%} {'same' if same_order else 'DIFF':>6s}")
+
+
+if __name__ == '__main__':
+    main()
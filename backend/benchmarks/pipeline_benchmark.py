@@ -0,0 +1,179 @@
+"""
+Reproducible benchmark suite for the parse/render pipeline.
+
+Generates synthetic PDF and DOCX resumes (1-20 pages, several section layouts; see
+benchmarks/synthetic.py) and measures:
+  * parse_resume, end to end and per stage (from the core.metrics stage timers)
+  * generate_portfolio_html
+  * POST /api/upload_resume through the Flask test client (result cache disabled)
+
+Reports p50/p95/p99 latency, throughput and peak RSS, and writes everything to JSON so runs can
+be compared. With --baseline, the run fails (exit code 1) if any scenario's p95 is more than
+--threshold slower than in the baseline file.
+
+Run from the backend directory:
+    python -m benchmarks.pipeline_benchmark --output bench.json
+    python -m benchmarks.pipeline_benchmark --baseline bench.json --threshold 0.2
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from typing import Callable, Dict, List
+
+# The end-to-end scenario must measure real work, not cache hits
+os.environ.setdefault('RESULT_CACHE_SIZE', '0')
+os.environ.setdefault('RESULT_CACHE_DIR', '')
+# Every document would otherwise reuse the static and unchanged portfolio fragments of the last
+os.environ.setdefault('FRAGMENT_CACHE_SIZE', '0')
+# Every upload comes from the same test client; don't let the per-client rate limit reject them
+os.environ.setdefault('ADMISSION_RATE', '0')
+
+from core import metrics
+from core.resume_parser import parse_resume
+from core.portfolio_generator import generate_portfolio_html
+from benchmarks.synthetic import LAYOUTS, make_resume
+
+PAGE_COUNTS = (1, 5, 10, 20)
+QUICK_PAGE_COUNTS = (1, 5)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(timings_s: List[float]) -> Dict[str, float]:
+    values = sorted(t * 1000 for t in timings_s)
+    total_s = sum(timings_s)
+    return {
+        "n": len(values),
+        "mean_ms": sum(values) / len(values) if values else 0.0,
+        "p50_ms": percentile(values, 0.50),
+        "p95_ms": percentile(values, 0.95),
+        "p99_ms": percentile(values, 0.99),
+        "throughput_per_s": len(values) / total_s if total_s else 0.0,
+    }
+
+
+def build_corpus(page_counts) -> List[Dict]:
+    """Returns one document per (file type, page count, layout)."""
+    corpus = []
+    for file_type in ('pdf', 'docx'):
+        for pages in page_counts:
+            for seed, layout in enumerate(LAYOUTS):
+                corpus.append({
+                    "name": f"{file_type}-{pages}p-{layout}.{file_type}",
+                    "file_type": file_type,
+                    "pages": pages,
+                    "bytes": make_resume(file_type, pages=pages, layout=layout, seed=seed),
+                })
+    return corpus
+
+
+def _run(fn: Callable, corpus: List[Dict], iterations: int, group_key: Callable) -> Dict[str, List[float]]:
+    timings: Dict[str, List[float]] = {}
+    # Parser and app diagnostics go to stderr so the report on stdout stays readable
+    with contextlib.redirect_stdout(sys.stderr):
+        for _ in range(iterations):
+            for doc in corpus:
+                started = time.perf_counter()
+                fn(doc)
+                timings.setdefault(group_key(doc), []).append(time.perf_counter() - started)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the resume parse/render pipeline.")
+    parser.add_argument("--iterations", type=int, default=5, help="Passes over the corpus per scenario")
+    parser.add_argument("--quick", action="store_true", help="Only 1 and 5 page documents")
+    parser.add_argument("--output", default=None, help="Write results JSON to this path")
+    parser.add_argument("--baseline", default=None, help="Compare against a previous results JSON")
+    parser.add_argument("--threshold", type=float, default=0.20, help="Allowed p95 slowdown vs baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    corpus = build_corpus(QUICK_PAGE_COUNTS if args.quick else PAGE_COUNTS)
+    by_size = lambda doc: f"{doc['file_type']}-{doc['pages']}p"
+    scenarios: Dict[str, Dict] = {}
+    stage_timings: Dict[str, List[float]] = {}
+
+    # parse_resume, with per-stage breakdown
+    parsed = {}
+    def run_parse(doc):
+        metrics.start_request_timing()
+        parsed[doc["name"]] = parse_resume(io.BytesIO(doc["bytes"]), filename=doc["name"])
+        for stage, elapsed in metrics.get_request_timings():
+            stage_timings.setdefault(stage, []).append(elapsed)
+    _run(run_parse, corpus[:1], 1, by_size)  # warm-up (model load), not recorded
+    stage_timings.clear()
+    for group, timings in _run(run_parse, corpus, args.iterations, by_size).items():
+        scenarios[f"parse_resume/{group}"] = summarize(timings)
+
+    # generate_portfolio_html on the data parsed above
+    for group, timings in _run(lambda doc: generate_portfolio_html(parsed[doc["name"]]), corpus, args.iterations, by_size).items():
+        scenarios[f"generate_portfolio_html/{group}"] = summarize(timings)
+
+    # End to end through the Flask app
+    from app import app
+    client = app.test_client()
+    def run_upload(doc):
+        response = client.post('/api/upload_resume', data={'resume': (io.BytesIO(doc["bytes"]), doc["name"])},
+                               content_type='multipart/form-data')
+        if response.status_code != 200:
+            raise RuntimeError(f"{doc['name']}: HTTP {response.status_code} {response.get_json()}")
+    for group, timings in _run(run_upload, corpus, args.iterations, by_size).items():
+        scenarios[f"upload_resume/{group}"] = summarize(timings)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "documents": len(corpus),
+        },
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024),
+        "scenarios": scenarios,
+        "stages": {stage: summarize(timings) for stage, timings in sorted(stage_timings.items())},
+    }
+
+    print(f"{'scenario':34s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'docs/s':>9s}")
+    for name, stats in list(scenarios.items()) + [(f"stage/{k}", v) for k, v in results["stages"].items()]:
+        print(f"{name:34s} {stats['p50_ms']:9.2f} {stats['p95_ms']:9.2f} {stats['p99_ms']:9.2f} {stats['throughput_per_s']:9.1f}")
+    print(f"peak RSS: {results['peak_rss_mb']:.1f} MB")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = []
+        for name, stats in scenarios.items():
+            previous = baseline.get("scenarios", {}).get(name)
+            if previous and previous["p95_ms"] > 0:
+                change = stats["p95_ms"] / previous["p95_ms"] - 1
+                if change > args.threshold:
+                    regressions.append(f"{name}: p95 {previous['p95_ms']:.2f} -> {stats['p95_ms']:.2f} ms (+{change:.0%})")
+        if regressions:
+            print(f"\nRegressions beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo p95 regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
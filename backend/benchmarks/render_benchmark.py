@@ -0,0 +1,103 @@
+"""
+Render latency benchmark for generate_portfolio_html.
+
+Compares the shared, precompiled Jinja environment against building a fresh Environment per
+call (how the generator used to work, which recompiled the template on every request), and
+rendering the whole template against the fragment cache, both for repeated data and for data
+where one section changes on every call.
+
+Run from the backend directory:
+    python -m benchmarks.render_benchmark [--iterations N]
+"""
+import argparse
+import datetime
+import itertools
+import statistics
+import time
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from core.portfolio_generator import (PORTFOLIO_TEMPLATE, TEMPLATE_DIR, generate_portfolio_html, get_environment,
+                                      precompile_templates)
+
+SAMPLE_DATA = {
+    "name": "Alice Wonderland",
+    "title": "Chief Storyteller",
+    "email": "alice@wonderland.com",
+    "phone": "+123-456-7890",
+    "linkedin": "linkedin.com/in/alicew",
+    "github": "github.com/alicew",
+    "website": "alicewonderland.dev",
+    "summary": "Experienced in navigating rabbit holes and attending mad tea parties.",
+    "experience": [
+        {"title": f"Role {i}", "company": f"Company {i}", "dates": "2019 - 2021",
+         "description": "Played croquet with flamingos and hedgehogs.\nSpecialized in unfair advantages."}
+        for i in range(5)
+    ],
+    "education": [
+        {"degree": "PhD in Nonsense", "institution": "Mad Hatter University", "dates": "A Few Years Back",
+         "details": "Thesis on 'The philosophical implications of unbirthdays'."}
+    ],
+    "skills": ["Riddles", "Logic Puzzles", "Grinning", "Disappearing Acts", "Tea"],
+    "projects": [
+        {"name": f"Project {i}", "description": "A device to find that elusive cat.",
+         "technologies": ["Quantum Entanglement", "Whimsy"], "link": "#"}
+        for i in range(4)
+    ],
+    "profile_image_url": "",
+}
+
+
+def _render_with_fresh_environment(data, template_name="generated_portfolio_template.html"):
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=select_autoescape(['html', 'xml']),
+        trim_blocks=True,
+        lstrip_blocks=True
+    )
+    return env.get_template(template_name).render(data=data, current_year=datetime.datetime.now().year)
+
+
+def _render_whole_template(data):
+    return get_environment().get_template(PORTFOLIO_TEMPLATE).render(data=data, current_year=datetime.datetime.now().year)
+
+
+_edit_counter = itertools.count()
+
+
+def _render_with_edited_skills(data):
+    return generate_portfolio_html(dict(data, skills=data["skills"] + [f"Skill {next(_edit_counter)}"]))
+
+
+def _measure(fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn(SAMPLE_DATA)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "mean_ms": statistics.mean(timings),
+        "p50_ms": timings[len(timings) // 2],
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    precompile_templates()
+    results = {
+        "fresh environment per call (before)": _measure(_render_with_fresh_environment, args.iterations),
+        "shared environment, whole template": _measure(_render_whole_template, args.iterations),
+        "fragment cache, same data": _measure(generate_portfolio_html, args.iterations),
+        "fragment cache, skills edited per call": _measure(_render_with_edited_skills, args.iterations),
+    }
+    for label, stats in results.items():
+        print(f"{label:42s} mean {stats['mean_ms']:7.3f} ms  p50 {stats['p50_ms']:7.3f} ms  p95 {stats['p95_ms']:7.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
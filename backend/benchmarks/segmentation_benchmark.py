@@ -0,0 +1,169 @@
+"""
+Section segmentation check and benchmark.
+
+Compares the single-pass _segment_sections against the per-section _find_section_content it
+replaced (reproduced below), section by section, on randomly generated heading soups (mixed
+case, colons, inline headings, blank-line runs, near-miss keywords) and on the synthetic
+resumes of every layout. Any difference is printed and the script exits with status 1. It then
+times both on synthetic resumes of growing size.
+
+Run from the backend directory:
+    python -m benchmarks.segmentation_benchmark [--documents N] [--seed S] [--pages 1 5 20] [--repeat N]
+"""
+import argparse
+import random
+import re
+import sys
+import time
+
+from core import resume_parser
+from benchmarks.synthetic import LAYOUTS, resume_lines
+
+
+def _legacy_find_section_content(text, keywords, next_section_keywords_lists=None):
+    """_find_section_content as parse_resume used it before _segment_sections."""
+    text_lower = text.lower()
+    start_index = -1
+
+    for keyword in keywords:
+        match = re.search(r"(^|\n)\s*" + re.escape(keyword) + r"\s*($|\n|:)", text_lower, re.MULTILINE)
+        if match:
+            start_index = match.end()
+            break
+
+    if start_index == -1:
+        return ""
+
+    end_index = len(text)
+    if next_section_keywords_lists:
+        for kw_list in next_section_keywords_lists:
+            for kw in kw_list:
+                next_match = re.search(r"(^|\n)\s*" + re.escape(kw) + r"\s*($|\n|:)", text_lower[start_index:], re.MULTILINE)
+                if next_match:
+                    current_end_index = start_index + next_match.start()
+                    if current_end_index < end_index:
+                        end_index = current_end_index
+
+    return text[start_index:end_index].strip()
+
+
+# The keyword lists parse_resume passed to each _find_section_content call
+_SUMMARY = resume_parser.SUMMARY_KEYWORDS
+_EXPERIENCE = resume_parser.EXPERIENCE_KEYWORDS
+_EDUCATION = resume_parser.EDUCATION_KEYWORDS
+_SKILLS = resume_parser.SKILLS_KEYWORDS
+_PROJECTS = resume_parser.PROJECTS_KEYWORDS
+LEGACY_CALLS = {
+    "summary": (_SUMMARY, [_EXPERIENCE, _EDUCATION, _SKILLS, _PROJECTS]),
+    "experience": (_EXPERIENCE, [_EDUCATION, _SKILLS, _PROJECTS]),
+    "education": (_EDUCATION, [_SKILLS, _PROJECTS, _EXPERIENCE]),
+    "skills": (_SKILLS, [_PROJECTS, _EXPERIENCE, _EDUCATION]),
+    "projects": (_PROJECTS, [_EXPERIENCE, _EDUCATION, _SKILLS]),
+}
+
+
+def _legacy_sections(text):
+    return {name: _legacy_find_section_content(text, keywords, boundaries)
+            for name, (keywords, boundaries) in LEGACY_CALLS.items()}
+
+
+def _segmented_sections(text):
+    sections = resume_parser._segment_sections(text)
+    return {name: resume_parser._section_text(text, sections, name) for name in LEGACY_CALLS}
+
+
+_KEYWORDS = [kw for kws in resume_parser.SECTION_KEYWORDS.values() for kw in kws]
+# Lines that look like headings but must not be taken for one
+_NEAR_MISSES = ["experiences", "skills and tools", "my projects", "education:ongoing", "summary of work",
+                "profile picture", "work", "history"]
+_FILLER = "led built designed team platform python 2019 - 2021 senior engineer at acme".split()
+_BLANKS = ["\n", "\n\n", "\n \n", "\n\t\n\n", "  \n"]
+
+
+def _random_case(rng, word):
+    return rng.choice([word, word.upper(), word.title(), word.capitalize()])
+
+
+def _random_line(rng):
+    roll = rng.random()
+    if roll < 0.35:
+        # A heading, possibly indented, padded and followed by a colon and more text
+        line = rng.choice([" ", "\t", ""]) * rng.randint(0, 2) + _random_case(rng, rng.choice(_KEYWORDS))
+        line += rng.choice(["", " ", "  ", "\t"])
+        if rng.random() < 0.4:
+            line += ":" + rng.choice(["", " ", " " + _random_case(rng, rng.choice(_KEYWORDS)),
+                                      " " + " ".join(rng.choices(_FILLER, k=3))])
+        return line
+    if roll < 0.45:
+        return _random_case(rng, rng.choice(_NEAR_MISSES))
+    if roll < 0.5:
+        # A keyword in the middle of a sentence is not a heading
+        return " ".join(rng.choices(_FILLER, k=2) + [rng.choice(_KEYWORDS)] + rng.choices(_FILLER, k=2))
+    return " ".join(rng.choices(_FILLER, k=rng.randint(1, 8)))
+
+
+def random_document(rng):
+    """A short document mixing headings, near misses, text lines and blank-line runs."""
+    parts = [rng.choice(["", "\n", " "])]
+    for _ in range(rng.randint(0, 14)):
+        parts.append(_random_line(rng))
+        parts.append(rng.choice(_BLANKS))
+    if rng.random() < 0.5:
+        parts.pop()
+    return "".join(parts)
+
+
+def _corpus(documents, seed):
+    rng = random.Random(seed)
+    for index in range(documents):
+        yield f"random #{index}", random_document(rng)
+    for layout in LAYOUTS:
+        for pages in (1, 3):
+            yield f"{layout} ({pages} page)", "\n".join(resume_lines(pages=pages, layout=layout, seed=pages))
+
+
+def _time(fn, text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=50000, help="Random documents to compare")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    checked = 0
+    mismatches = 0
+    for label, text in _corpus(args.documents, args.seed):
+        legacy = _legacy_sections(text)
+        segmented = _segmented_sections(text)
+        checked += 1
+        for name in legacy:
+            if legacy[name] != segmented[name]:
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"MISMATCH {label} section={name}\n  text={text!r}\n"
+                          f"  legacy={legacy[name]!r}\n  segmented={segmented[name]!r}")
+    print(f"compared {checked} documents x {len(LEGACY_CALLS)} sections: "
+          f"{mismatches} mismatches")
+
+    print(f"\n{'resume':>8s} {'chars':>8s} {'legacy ms':>10s} {'segment ms':>11s} {'speedup':>8s}")
+    for pages in args.pages:
+        text = "\n".join(resume_lines(pages=pages))
+        legacy_ms = _time(_legacy_sections, text, args.repeat)
+        segmented_ms = _time(_segmented_sections, text, args.repeat)
+        print(f"{pages:6d} p {len(text):8d} {legacy_ms:10.2f} {segmented_ms:11.2f} {legacy_ms / max(segmented_ms, 1e-6):7.1f}x")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""
+Synthetic resume generator for benchmarks.
+
+Builds deterministic PDF and DOCX resumes of a requested page count and section layout, so
+benchmark runs are reproducible without shipping real (personal) documents. PDFs are written
+directly (no extra dependency); DOCX files use python-docx, which the parser already needs.
+"""
+import io
+import random
+import textwrap
+import zlib
+from typing import List, Tuple
+
+LINES_PER_PAGE = 50
+
+# Section orderings and heading styles that exercise the segmenter differently
+LAYOUTS = {
+    'standard': (['Summary', 'Experience', 'Education', 'Skills', 'Projects'], '{}'),
+    'reordered': (['Profile', 'Skills', 'Work History', 'Projects', 'Education'], '{}'),
+    'colon_headings': (['About Me', 'Professional Experience', 'Technical Skills', 'Academic Background', 'Personal Projects'], '{}:'),
+    'upper_no_summary': (['EXPERIENCE', 'EDUCATION', 'CORE COMPETENCIES', 'PORTFOLIO'], '{}'),
+    # The long section comes last and runs to the end of the document
+    'experience_last': (['Summary', 'Education', 'Skills', 'Projects', 'Experience'], '{}'),
+}
+
+_WORDS = ("led built designed scaled migrated reduced latency throughput team platform service api "
+          "pipeline data customers revenue percent cloud python java go kubernetes postgres kafka "
+          "mentored shipped roadmap architecture testing monitoring reliability cost").split()
+_SKILLS = ["Python", "Java", "Go", "SQL", "Kubernetes", "Docker", "AWS", "React", "Flask", "Kafka",
+           "PostgreSQL", "Redis", "Terraform", "Spark", "TypeScript", "GraphQL"]
+
+
+def _sentence(rng, words=12):
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def resume_lines(pages: int = 1, layout: str = 'standard', seed: int = 0) -> List[str]:
+    """Returns the text lines of a synthetic resume filling roughly `pages` pages."""
+    rng = random.Random(seed)
+    sections, heading_format = LAYOUTS[layout]
+    target = max(1, pages) * LINES_PER_PAGE
+    lines = ["Jane Doe", "jane.doe@example.com | +1 415 555 0134 | linkedin.com/in/janedoe | github.com/janedoe",
+             "https://janedoe.dev", ""]
+
+    # Everything but experience is fixed size; experience grows to fill the requested pages
+    fixed = {}
+    for name in sections:
+        key = name.lower()
+        if any(k in key for k in ('summary', 'profile', 'about')):
+            fixed[name] = ["Senior Software Engineer", _sentence(rng, 20), _sentence(rng, 18)]
+        elif any(k in key for k in ('skill', 'competenc')):
+            fixed[name] = [", ".join(rng.sample(_SKILLS, 8)), ", ".join(rng.sample(_SKILLS, 6))]
+        elif any(k in key for k in ('education', 'academic')):
+            fixed[name] = ["BSc Computer Science", "State University, 2010 - 2014", "", "MSc Distributed Systems", "Tech Institute, 2014 - 2016"]
+        elif any(k in key for k in ('project', 'portfolio')):
+            fixed[name] = []
+            for i in range(3):
+                fixed[name] += [f"Project {i + 1}", _sentence(rng), ""]
+    used = len(lines) + sum(len(v) + 2 for v in fixed.values()) + 2
+
+    for name in sections:
+        lines.append(heading_format.format(name))
+        if name in fixed:
+            lines.extend(fixed[name])
+        else:
+            job = 0
+            while used < target or job == 0:
+                entry = [f"Engineer {job + 1}", f"Company {job + 1}, {2020 - job} - {2021 - job}",
+                         _sentence(rng), _sentence(rng), ""]
+                lines.extend(entry)
+                used += len(entry)
+                job += 1
+        lines.append("")
+    return lines
+
+
+def _pdf_escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def _pdf_text_ops(lines: List[str], columns: int) -> str:
+    """Content stream operators drawing `lines` in one column, or wrapped into `columns` columns."""
+    if columns <= 1:
+        return "BT /F1 10 Tf 50 760 Td 14 TL " + " ".join(f"({_pdf_escape(line)}) Tj T*" for line in lines) + " ET"
+    wrapped = [part for line in lines for part in (textwrap.wrap(line, 96 // columns) or [""])]
+    per_column = -(-len(wrapped) // columns)
+    ops = []
+    for column in range(columns):
+        column_lines = wrapped[column * per_column:(column + 1) * per_column]
+        ops.append(f"BT /F1 9 Tf {40 + column * 532 // columns} 760 Td 12 TL "
+                   + " ".join(f"({_pdf_escape(line)}) Tj T*" for line in column_lines) + " ET")
+    return " ".join(ops)
+
+
+def make_pdf(lines: List[str], images_per_page: int = 0, scanned_pages: int = 0, seed: int = 0,
+             columns: int = 1) -> bytes:
+    """
+    Writes `lines` into a minimal multi-page PDF using the built-in Helvetica font.
+
+    With `images_per_page`, each text page also draws that many small random-noise images (logos,
+    photos). `scanned_pages` appends that many pages holding only images and no text, like
+    scanned certificates attached to a CV. `columns` > 1 lays each page out in that many columns
+    of wrapped lines.
+    """
+    rng = random.Random(seed)
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+    pages += [None] * scanned_pages
+    objects: List[bytes] = []
+
+    def add(obj: bytes) -> int:
+        objects.append(obj)
+        return len(objects)
+
+    catalog_id = add(b"")  # placeholders filled in once the page ids are known
+    pages_id = add(b"")
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    page_ids = []
+    for page_lines in pages:
+        image_refs: List[Tuple[str, int]] = []
+        page_images = images_per_page if page_lines is not None else 12
+        for n in range(page_images):
+            raw = zlib.compress(bytes(rng.getrandbits(8) for _ in range(64 * 64)))
+            image_id = add(b"<< /Type /XObject /Subtype /Image /Width 64 /Height 64 /ColorSpace /DeviceGray "
+                           b"/BitsPerComponent 8 /Filter /FlateDecode /Length %d >>\nstream\n" % len(raw) + raw + b"\nendstream")
+            image_refs.append((f"Im{n}", image_id))
+
+        if page_lines is None:
+            content = b""
+        else:
+            content = _pdf_text_ops(page_lines, columns).encode("latin-1", "replace")
+        for n, (name, _) in enumerate(image_refs):
+            content += f" q 40 0 0 40 {450 + (n % 3) * 45} {700 - (n // 3) * 45} cm /{name} Do Q".encode()
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+
+        xobjects = " ".join(f"/{name} {obj_id} 0 R" for name, obj_id in image_refs)
+        page_ids.append(add(
+            f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 612 792] /Contents {content_id} 0 R "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> /XObject << {xobjects} >> >> >>".encode()))
+
+    objects[catalog_id - 1] = f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode()
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[pages_id - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + obj + b"\nendobj\n")
+    xref_at = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog_id, xref_at))
+    return out.getvalue()
+
+
+# A floating text box anchored in a run, as Word writes it: a DrawingML shape alone ('drawing'),
+# or wrapped in mc:AlternateContent with a VML fallback ('alternate_content')
+_TEXT_BOX_NAMESPACES = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing" '
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape" '
+    'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" '
+    'xmlns:v="urn:schemas-microsoft-com:vml"')
+_TEXT_BOX_DRAWING = (
+    '<w:drawing><wp:anchor><wp:extent cx="1828800" cy="457200"/><wp:docPr id="1" name="Text Box 1"/>'
+    '<a:graphic><a:graphicData uri="http://schemas.microsoft.com/office/word/2010/wordprocessingShape">'
+    '<wps:wsp><wps:txbx><w:txbxContent><w:p><w:r><w:t>{text}</w:t></w:r></w:p></w:txbxContent></wps:txbx>'
+    '</wps:wsp></a:graphicData></a:graphic></wp:anchor></w:drawing>')
+_TEXT_BOX_FALLBACK = (
+    '<w:pict><v:shape><v:textbox><w:txbxContent><w:p><w:r><w:t>{text}</w:t></w:r></w:p>'
+    '</w:txbxContent></v:textbox></v:shape></w:pict>')
+TEXT_BOX_STYLES = {
+    'drawing': _TEXT_BOX_DRAWING,
+    'alternate_content': (f'<mc:AlternateContent><mc:Choice Requires="wps">{_TEXT_BOX_DRAWING}</mc:Choice>'
+                          f'<mc:Fallback>{_TEXT_BOX_FALLBACK}</mc:Fallback></mc:AlternateContent>'),
+}
+
+
+def make_docx(lines: List[str], tables: bool = False, text_box: str = '') -> bytes:
+    """
+    Writes `lines` as paragraphs of a DOCX document.
+
+    With `tables`, the contact line goes into a one-row table (one detail per cell) and skill
+    lists into a four-column grid with one skill per cell, as many resume templates lay them out.
+    `text_box` (a TEXT_BOX_STYLES key) anchors a floating text box in the second paragraph.
+    """
+    from docx import Document
+    from docx.oxml import parse_xml
+    doc = Document()
+    for index, line in enumerate(lines):
+        if text_box and index == 1:
+            paragraph = doc.add_paragraph(line)
+            markup = TEXT_BOX_STYLES[text_box].format(text="Open to relocation")
+            paragraph._p.append(parse_xml(f'<w:r {_TEXT_BOX_NAMESPACES}>{markup}</w:r>'))
+            continue
+        if tables and " | " in line:
+            cells = line.split(" | ")
+        elif tables and line and all(item in _SKILLS for item in line.split(", ")):
+            cells = line.split(", ")
+        else:
+            doc.add_paragraph(line)
+            continue
+        columns = min(4, len(cells))
+        table = doc.add_table(rows=(len(cells) + columns - 1) // columns, cols=columns)
+        for i, cell in enumerate(cells):
+            table.cell(i // columns, i % columns).text = cell
+    out = io.BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def make_resume(file_type: str = 'pdf', pages: int = 1, layout: str = 'standard',
+                images_per_page: int = 0, scanned_pages: int = 0, seed: int = 0, tables: bool = False,
+                text_box: str = '', columns: int = 1) -> bytes:
+    """Convenience wrapper returning the bytes of a synthetic PDF or DOCX resume."""
+    lines = resume_lines(pages=pages, layout=layout, seed=seed)
+    if file_type == 'docx':
+        return make_docx(lines, tables=tables, text_box=text_box)
+    return make_pdf(lines, images_per_page=images_per_page, scanned_pages=scanned_pages, seed=seed,
+                    columns=columns)
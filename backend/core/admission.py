@@ -0,0 +1,97 @@
+"""
+Admission control for the upload API.
+
+Two independent limits, checked before a request does any work:
+
+  * `RateLimiter`: a token bucket per client. Each client may make `burst` requests at once and
+    then `rate` requests per second on average; beyond that it is told when to retry (HTTP 429).
+  * `InFlightLimiter`: a cap on how many admitted requests are being processed at the same time,
+    across all clients. When it is reached, new requests are turned away immediately (HTTP 503)
+    instead of queueing behind the busy ones.
+
+Both keep their state in memory, so under a multi-process server they apply per worker process.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+
+class RateLimiter:
+    """
+    Per-client token buckets holding up to `burst` tokens, refilled at `rate` tokens per second.
+
+    At most `max_clients` buckets are kept; the least recently seen client is forgotten first,
+    which only ever gives that client a fresh (full) bucket.
+    """
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 10000):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_clients = max(1, int(max_clients))
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()  # client -> (tokens, updated_at)
+        self._lock = threading.Lock()
+        self.limited = 0
+
+    def acquire(self, client: str) -> Tuple[bool, float]:
+        """
+        Takes a token from `client`'s bucket.
+
+        Returns (True, 0) if the request may proceed, otherwise (False, seconds until a token
+        will be available).
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            else:
+                self.limited += 1
+            self._buckets[client] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return (True, 0.0) if allowed else (False, (1 - tokens) / self.rate)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'rate': self.rate, 'burst': self.burst, 'clients': len(self._buckets), 'limited': self.limited}
+
+
+class InFlightLimiter:
+    """Counts requests in progress and refuses new ones once `limit` are running."""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, int(limit))
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def try_acquire(self) -> bool:
+        """Reserves a slot. Returns False, without waiting, if all slots are taken."""
+        with self._lock:
+            if self._in_flight >= self.limit:
+                self.rejected += 1
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self) -> None:
+        """Frees a slot reserved by try_acquire."""
+        with self._lock:
+            self._in_flight -= 1
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'limit': self.limit, 'in_flight': self._in_flight, 'rejected': self.rejected}
+
+
+def retry_after_header(seconds: float) -> str:
+    """Formats a wait as a Retry-After value (whole seconds, at least 1)."""
+    return str(max(1, math.ceil(seconds)))
@@ -0,0 +1,280 @@
+"""
+Batch resume ingestion.
+
+Fans parsing out across a process pool and yields one result per file as soon as it is
+complete, so callers can stream NDJSON instead of waiting for the whole batch. Errors are
+isolated per file: a corrupt document produces an error record, not a failed batch.
+
+Given an ExtractionSandbox (as the HTTP endpoint does for untrusted uploads), the text is
+extracted in the sandbox's worker processes instead, under its per-document timeout and memory
+cap, and the rest of the work runs on threads of the caller. A hostile document then costs one
+error record after EXTRACTION_TIMEOUT instead of stalling the batch.
+
+Name extraction (spaCy NER) is not run per document in the pool: workers return each resume's
+header snippet, and the parent runs them through nlp.pipe in batches of `ner_batch_size`.
+Records are therefore yielded once their batch is complete, or once the oldest of them has
+waited `ner_max_wait` seconds, and portfolios are rendered in the parent once the name is known.
+Pass ner_batch_size=0 to extract names in the workers instead.
+
+Command-line usage (from the backend directory):
+    python -m core.batch path/to/resumes [--workers N] [--html] [--output results.ndjson]
+                         [--ner-batch-size N] [--ner-max-wait SECONDS] [--ner-processes N]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .resume_parser import extract_names, extract_resume_text, name_candidate_text, parse_resume, parse_text
+from .portfolio_generator import generate_portfolio_html
+from .nlp_provider import NLP_BATCH_SIZE
+from .extraction_sandbox import ExtractionError
+from .models import json_default
+
+BATCH_EXTENSIONS = {'.pdf', '.docx'}
+# Guards against zip bombs and oversized archives
+MAX_BATCH_FILES = int(os.environ.get('MAX_BATCH_FILES', 500))
+MAX_BATCH_UNCOMPRESSED_BYTES = int(os.environ.get('MAX_BATCH_UNCOMPRESSED_BYTES', 200 * 1024 * 1024))
+
+
+class BatchTooLargeError(Exception):
+    """Raised when an archive has more files or more uncompressed data than the batch limits allow."""
+
+
+# Key under which a worker hands the header snippet to the parent when names are batched
+_HEADER_KEY = '_name_candidate_text'
+
+
+def process_batch_item(name: str, source: Union[bytes, str], include_html: bool = False,
+                       defer_name: bool = False, sandbox=None) -> Dict[str, Any]:
+    """
+    Parses one resume of a batch. `source` is either the file's bytes or a path to it.
+
+    Runs inside a pool process, or with a `sandbox` in a thread of the caller while the
+    extraction runs in the sandbox. Always returns a record (never raises) so one bad file can't
+    take the rest of the batch down with it; sandbox failures carry its 'error_code'. In a pool
+    process, diagnostics printed by the parser go to stderr so they can't interleave with NDJSON
+    written to stdout (redirecting in a thread would affect the whole process).
+
+    With `defer_name`, name extraction and rendering are left to the caller: the record carries
+    the header snippet for extract_names instead (see process_batch).
+    """
+    try:
+        with contextlib.redirect_stdout(sys.stderr) if sandbox is None else contextlib.nullcontext():
+            file_path = io.BytesIO(source) if isinstance(source, bytes) else source
+            if defer_name:
+                raw_text = extract_resume_text(file_path, filename=name, sandbox=sandbox)
+                if not raw_text.strip():
+                    return {'file': name, 'error': "Could not extract text from resume."}
+                resume, _ = parse_text(raw_text, name="")
+                return {'file': name, 'extracted_data': resume, _HEADER_KEY: name_candidate_text(raw_text)}
+            parsed_data = parse_resume(file_path, filename=name, sandbox=sandbox)
+            if parsed_data.get("error"):
+                return {'file': name, 'error': parsed_data["error"]}
+            record = {'file': name, 'extracted_data': parsed_data}
+            if include_html:
+                record['html_content'] = generate_portfolio_html(parsed_data)
+            return record
+    except ExtractionError as e:
+        return {'file': name, 'error': f'Error processing file: {e}', 'error_code': e.code}
+    except Exception as e:
+        return {'file': name, 'error': f'Error processing file: {str(e)}'}
+
+
+def iter_zip_members(archive: Union[bytes, str]) -> Iterator[Tuple[str, Union[bytes, Exception]]]:
+    """
+    Returns an iterator of (name, bytes) for each PDF/DOCX member of a zip archive.
+
+    Directories, hidden files (e.g. macOS __MACOSX entries) and other file types are skipped.
+    The archive is opened and checked against MAX_BATCH_FILES and MAX_BATCH_UNCOMPRESSED_BYTES
+    (using the central directory) right away, raising BatchTooLargeError or zipfile.BadZipFile
+    from this call. Members are then only decompressed as the iterator is advanced, so
+    process_batch holds no more of them in memory than it has in flight. A member that can't be
+    decompressed is yielded with the exception in place of its bytes.
+    """
+    source = io.BytesIO(archive) if isinstance(archive, bytes) else archive
+    zf = zipfile.ZipFile(source)
+    try:
+        members = [info for info in zf.infolist()
+                   if not info.is_dir()
+                   and not os.path.basename(info.filename).startswith('.')
+                   and not info.filename.startswith('__MACOSX/')
+                   and os.path.splitext(info.filename)[1].lower() in BATCH_EXTENSIONS]
+        if len(members) > MAX_BATCH_FILES:
+            raise BatchTooLargeError(f'Archive contains {len(members)} resumes; the limit is {MAX_BATCH_FILES}.')
+        total_size = sum(info.file_size for info in members)
+        if total_size > MAX_BATCH_UNCOMPRESSED_BYTES:
+            raise BatchTooLargeError(f'Archive expands to {total_size} bytes; the limit is {MAX_BATCH_UNCOMPRESSED_BYTES}.')
+    except Exception:
+        zf.close()
+        raise
+    return _read_zip_members(zf, members)
+
+
+def _read_zip_members(zf: zipfile.ZipFile, members: List[zipfile.ZipInfo]) -> Iterator[Tuple[str, Union[bytes, Exception]]]:
+    with zf:
+        for info in members:
+            try:
+                data = zf.read(info)
+            except (zipfile.BadZipFile, zlib.error, EOFError, NotImplementedError, RuntimeError) as e:
+                # Corrupt, truncated, encrypted or unsupported member; reported as its own record
+                yield info.filename, e
+            else:
+                yield info.filename, data
+
+
+def iter_directory(directory: str) -> Iterator[Tuple[str, str]]:
+    """Yields (relative name, path) for each PDF/DOCX file under `directory`, in sorted order."""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in BATCH_EXTENSIONS and not name.startswith('.'):
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, directory), path
+
+
+def _complete_names(records: List[Dict[str, Any]], include_html: bool, ner_processes: Optional[int],
+                    redirect_output: bool) -> Iterator[Dict[str, Any]]:
+    """
+    Fills in the names of deferred records with one extract_names call, rendering if asked.
+
+    With `redirect_output`, parser diagnostics go to stderr as in process_batch_item. process_batch
+    turns it off when it runs with a sandbox, i.e. in a request thread of the server, where
+    redirecting would affect every thread of the process.
+    """
+    try:
+        with contextlib.redirect_stdout(sys.stderr) if redirect_output else contextlib.nullcontext():
+            names = extract_names([record.pop(_HEADER_KEY) for record in records],
+                                  batch_size=len(records), n_process=ner_processes)
+    except Exception as e:
+        for record in records:
+            yield {'file': record['file'], 'error': f'Error processing file: {str(e)}'}
+        return
+    for record, name in zip(records, names):
+        record['extracted_data'].name = name
+        if include_html:
+            with contextlib.redirect_stdout(sys.stderr) if redirect_output else contextlib.nullcontext():
+                record['html_content'] = generate_portfolio_html(record['extracted_data'])
+        yield record
+
+
+def process_batch(items: Iterable[Tuple[str, Union[bytes, str]]], max_workers: Optional[int] = None,
+                  include_html: bool = False, ner_batch_size: Optional[int] = None,
+                  ner_processes: Optional[int] = None, sandbox=None,
+                  ner_max_wait: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Processes (name, bytes-or-path) items on a process pool and yields records in completion order.
+    An item whose source is an exception (a member iter_zip_members could not read) is yielded
+    as an error record straight away.
+
+    At most 2 * max_workers items are in flight at once, so a large directory is not read into
+    memory up front. The pool defaults to one process per core. With a `sandbox` (a
+    core.extraction_sandbox.ExtractionSandbox, or its background() view) extraction runs in its
+    processes and the items are handled by max_workers threads instead, by default one per
+    sandbox worker.
+
+    Names are extracted in the parent with nlp.pipe over `ner_batch_size` resumes at a time
+    (default NLP_BATCH_SIZE) using `ner_processes` processes (default NLP_N_PROCESS); a smaller
+    batch is run when no more work is in flight, or, with `ner_max_wait`, once a record has
+    waited that many seconds for its name, so a consumer streaming the results sees each one
+    soon after its file is done. ner_batch_size=0 extracts names per document in the pool
+    workers instead. Results are the same either way.
+    """
+    max_workers = max_workers or (sandbox.workers if sandbox is not None else os.cpu_count()) or 1
+    ner_batch_size = NLP_BATCH_SIZE if ner_batch_size is None else ner_batch_size
+    defer_name = ner_batch_size > 0
+    window = max_workers * 2
+    items = iter(items)
+    awaiting_name: List[Dict[str, Any]] = []
+    awaiting_since = 0.0
+    executor_class = ThreadPoolExecutor if sandbox is not None else ProcessPoolExecutor
+    with executor_class(max_workers=max_workers) as executor:
+        pending = {}
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < window:
+                item = next(items, None)
+                if item is None:
+                    exhausted = True
+                    break
+                name, source = item
+                if isinstance(source, Exception):
+                    # The item could not be read (see iter_zip_members)
+                    yield {'file': name, 'error': f'Error reading file: {source}'}
+                    continue
+                pending[executor.submit(process_batch_item, name, source, include_html, defer_name, sandbox)] = name
+            if not pending:
+                break
+            timeout = None
+            if awaiting_name and ner_max_wait is not None:
+                timeout = max(0.0, awaiting_since + ner_max_wait - time.monotonic())
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    record = future.result()
+                except Exception as e:
+                    # The worker process itself died (e.g. killed for memory); report it per file
+                    record = {'file': name, 'error': f'Error processing file: {str(e)}'}
+                if _HEADER_KEY in record:
+                    if not awaiting_name:
+                        awaiting_since = time.monotonic()
+                    awaiting_name.append(record)
+                else:
+                    yield record
+            waited_too_long = ner_max_wait is not None and time.monotonic() - awaiting_since >= ner_max_wait
+            if awaiting_name and (len(awaiting_name) >= ner_batch_size or (exhausted and not pending) or waited_too_long):
+                yield from _complete_names(awaiting_name, include_html, ner_processes, sandbox is None)
+                awaiting_name = []
+    if awaiting_name:
+        yield from _complete_names(awaiting_name, include_html, ner_processes, sandbox is None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse every PDF/DOCX resume in a directory and print NDJSON results.")
+    parser.add_argument("directory", help="Directory (searched recursively) or .zip archive of resumes")
+    parser.add_argument("--workers", type=int, default=None, help="Pool size (default: number of cores)")
+    parser.add_argument("--html", action="store_true", help="Include the rendered portfolio HTML in each record")
+    parser.add_argument("--output", default=None, help="Write NDJSON here instead of stdout")
+    parser.add_argument("--ner-batch-size", type=int, default=None,
+                        help=f"Resumes per nlp.pipe name-extraction batch (default {NLP_BATCH_SIZE}; 0 = per document)")
+    parser.add_argument("--ner-max-wait", type=float, default=None,
+                        help="Run a smaller name-extraction batch once a result has waited this many seconds")
+    parser.add_argument("--ner-processes", type=int, default=None, help="n_process for nlp.pipe (default NLP_N_PROCESS)")
+    args = parser.parse_args(argv)
+
+    if os.path.isdir(args.directory):
+        items = iter_directory(args.directory)
+    elif zipfile.is_zipfile(args.directory):
+        try:
+            items = iter_zip_members(args.directory)
+        except (BatchTooLargeError, zipfile.BadZipFile) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
+    else:
+        parser.error(f"{args.directory} is neither a directory nor a zip archive")
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    failures = 0
+    try:
+        for record in process_batch(items, max_workers=args.workers, include_html=args.html,
+                                    ner_batch_size=args.ner_batch_size, ner_processes=args.ner_processes,
+                                    ner_max_wait=args.ner_max_wait):
+            failures += 'error' in record
+            out.write(json.dumps(record, default=json_default) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""
+Isolated, bounded-time document text extraction.
+
+`ExtractionSandbox` keeps a small pool of worker processes that run the PDF/DOCX text extraction
+from core.resume_parser. A malformed or hostile document can only take its worker down, never the
+request worker that asked for it:
+
+  * every extraction has a hard wall-clock timeout, after which the worker is killed;
+  * workers run under an RLIMIT_AS address-space cap, so runaway allocations fail with a
+    MemoryError inside the worker instead of exhausting the host;
+  * workers are recycled after a number of documents to contain memory growth;
+  * callers wait a bounded time for a free worker, and background work (see `background()`)
+    leaves some workers free for them, so a large batch can't hold up interactive requests.
+
+Failures are raised in the caller as ExtractionError with a machine-readable `code`. Workers are
+started on first use in each process, so importing the app in a pre-forking server does not start
+them in the master.
+"""
+import io
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows: workers run without a memory cap
+    resource = None
+
+from . import resume_parser
+
+# ExtractionError codes
+TIMEOUT = 'timeout'
+MEMORY_LIMIT = 'memory_limit'
+CRASHED = 'crashed'
+FAILED = 'failed'
+BUSY = 'busy'
+
+
+class ExtractionError(Exception):
+    """Raised when a document could not be extracted in the sandbox. `code` is one of the codes above."""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+def _address_space_size() -> int:
+    """Current virtual memory size of this process in bytes, or 0 if it cannot be read."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _limit_memory(headroom: int) -> None:
+    # A forked worker inherits its parent's address space (spaCy, pdfminer, ...), so the cap is
+    # set as headroom above the size the worker starts with rather than as an absolute value.
+    if resource is None or headroom <= 0:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = _address_space_size() + headroom
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _worker_main(conn, memory_headroom: int) -> None:
+    """Worker process loop: receives (source, extension) requests and replies with the text or an error."""
+    # Don't run the server's signal handlers (e.g. gunicorn's) in the worker; the parent stops it
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _limit_memory(memory_headroom)
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            return  # Parent went away
+        if request is None:
+            return
+        source, extension = request
+        try:
+            if isinstance(source, bytes):
+                source = io.BytesIO(source)
+            reply = (True, resume_parser._read_document_text(source, extension))
+        except MemoryError:
+            reply = (False, MEMORY_LIMIT, 'Document needed more memory than allowed.')
+        except Exception as e:
+            reply = (False, FAILED, f'Could not extract text from document ({type(e).__name__}: {e}).')
+        source = None
+        try:
+            conn.send(reply)
+        except (MemoryError, OSError):
+            return
+        if reply[0] is False and reply[1] == MEMORY_LIMIT:
+            return  # The heap may be left fragmented; let the parent start a fresh worker
+
+
+class _Worker:
+    def __init__(self, context, memory_headroom: int):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, memory_headroom),
+                                       name='extraction-sandbox', daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.documents = 0
+
+    def stop(self, kill: bool = False) -> None:
+        if not kill:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+            self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ExtractionSandbox:
+    """
+    Pool of up to `workers` extraction processes.
+
+    Each document gets `timeout` seconds of wall-clock time and its worker may grow by at most
+    `memory_limit_mb` MB of address space (0 disables the cap). Workers are replaced after
+    `max_documents` documents, and after any timeout, memory error or crash.
+
+    Callers beyond `workers` concurrent extractions wait for a free worker, for at most
+    `wait_timeout` seconds (None = no limit), after which ExtractionError('busy') is raised.
+    Extractions made through background() wait as long as it takes, but never take the last
+    `reserved_workers` workers, which are kept for the other callers.
+    """
+
+    def __init__(self, workers: int = 2, timeout: float = 30, memory_limit_mb: int = 1024,
+                 max_documents: int = 100, start_method: Optional[str] = None,
+                 wait_timeout: Optional[float] = None, reserved_workers: int = 0):
+        self.workers = max(1, int(workers))
+        self.timeout = timeout
+        self.wait_timeout = wait_timeout
+        # At least one worker always stays available to background work
+        self.reserved_workers = min(max(0, int(reserved_workers)), self.workers - 1)
+        self.memory_headroom = max(0, int(memory_limit_mb)) * 1024 * 1024
+        self.max_documents = max(1, int(max_documents))
+        self._context = multiprocessing.get_context(start_method)
+        self._idle: List[_Worker] = []
+        self._started = 0
+        self._pid = os.getpid()
+        self._cond = threading.Condition()
+        self._stats = {'documents': 0, 'recycled': 0, TIMEOUT: 0, MEMORY_LIMIT: 0, CRASHED: 0, FAILED: 0, BUSY: 0}
+
+    def _acquire(self, background: bool = False) -> _Worker:
+        # Background callers may use every worker but the reserved ones, and wait without a limit
+        limit = self.workers - self.reserved_workers if background else self.workers
+        deadline = None if background or self.wait_timeout is None else time.monotonic() + self.wait_timeout
+        with self._cond:
+            if self._pid != os.getpid():
+                # Workers inherited across fork belong to the parent; start our own
+                self._idle, self._started, self._pid = [], 0, os.getpid()
+            while self._started - len(self._idle) >= limit:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._stats[BUSY] += 1
+                    raise ExtractionError(BUSY, f'All document extraction workers stayed busy for {self.wait_timeout:g} seconds.')
+                self._cond.wait(remaining)
+            if self._idle:
+                return self._idle.pop()
+            self._started += 1
+        try:
+            return _Worker(self._context, self.memory_headroom)
+        except Exception:
+            with self._cond:
+                self._started -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, worker: _Worker, retire: bool, kill: bool = False) -> None:
+        if retire:
+            worker.stop(kill=kill)
+        with self._cond:
+            if retire:
+                self._started -= 1
+            else:
+                self._idle.append(worker)
+            self._cond.notify()
+
+    def _fail(self, code: str, message: str) -> ExtractionError:
+        with self._cond:
+            self._stats[code] += 1
+        return ExtractionError(code, message)
+
+    def extract(self, source, extension: str, background: bool = False) -> str:
+        """
+        Extracts the text of a PDF or DOCX document in a worker process.
+
+        `source` is a file path or a binary file object, which is read from its current position.
+        Raises ExtractionError if the document fails, times out, exceeds the memory limit or
+        crashes its worker, or if no worker became free within wait_timeout ('busy').
+        `background` is set by the view background() returns.
+        """
+        payload = source if isinstance(source, str) else source.read()
+        worker = self._acquire(background)
+        try:
+            worker.conn.send((payload, extension))
+            if not worker.conn.poll(self.timeout):
+                self._release(worker, retire=True, kill=True)
+                raise self._fail(TIMEOUT, f'Document extraction did not finish within {self.timeout:g} seconds.')
+            reply = worker.conn.recv()
+        except (EOFError, OSError):
+            worker.process.join(1)
+            exitcode = worker.process.exitcode
+            self._release(worker, retire=True, kill=True)
+            raise self._fail(CRASHED, f'Document extraction worker exited unexpectedly (exit code {exitcode}).')
+
+        worker.documents += 1
+        with self._cond:
+            self._stats['documents'] += 1
+        if reply[0] is True:
+            retire = worker.documents >= self.max_documents
+            if retire:
+                with self._cond:
+                    self._stats['recycled'] += 1
+            self._release(worker, retire=retire)
+            return reply[1]
+        _, code, message = reply
+        self._release(worker, retire=code == MEMORY_LIMIT or worker.documents >= self.max_documents)
+        raise self._fail(code, message)
+
+    def background(self) -> "BackgroundSandbox":
+        """Returns a view of this sandbox for batch and queued work; see the class docstring."""
+        return BackgroundSandbox(self)
+
+    def close(self) -> None:
+        """Stops the idle workers of this process."""
+        with self._cond:
+            idle = self._idle if self._pid == os.getpid() else []
+            self._idle = []
+            self._started -= len(idle)
+        for worker in idle:
+            worker.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns pool size, documents processed, recycled workers and failure counts by code."""
+        with self._cond:
+            return dict(self._stats, workers=self.workers, started=self._started, idle=len(self._idle),
+                        timeout_seconds=self.timeout, memory_limit_mb=self.memory_headroom // (1024 * 1024),
+                        max_documents=self.max_documents, wait_timeout_seconds=self.wait_timeout,
+                        reserved_workers=self.reserved_workers)
+
+
+class BackgroundSandbox:
+    """
+    An ExtractionSandbox as seen by background work: extractions wait for a worker as long as it
+    takes but leave the sandbox's reserved workers free. `workers` is how many it can use at once.
+    """
+
+    def __init__(self, sandbox: ExtractionSandbox):
+        self.sandbox = sandbox
+        self.workers = sandbox.workers - sandbox.reserved_workers
+
+    def extract(self, source, extension: str) -> str:
+        return self.sandbox.extract(source, extension, background=True)
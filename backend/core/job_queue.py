@@ -0,0 +1,275 @@
+import io
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .resume_parser import parse_resume
+from .portfolio_generator import generate_portfolio_html
+from .extraction_sandbox import ExtractionError
+from .result_cache import ResultCache
+
+# Job statuses
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+TIMEOUT = 'timeout'
+
+
+class QueueFullError(Exception):
+    """Raised by JobQueue.submit when the number of unfinished jobs has reached the limit."""
+
+
+def process_resume_bytes(file_bytes: bytes, filename: str, sandbox=None) -> Dict[str, Any]:
+    """
+    Runs the full parse -> render pipeline for an uploaded resume held in memory.
+
+    With a `sandbox` (a core.extraction_sandbox.ExtractionSandbox, or its background() view) the
+    text extraction runs in one of its worker processes, under its hard timeout and memory cap;
+    a document that fails there is reported with the sandbox's 'error_code'. Errors are
+    returned as {'error': ...} rather than raised so the caller can report them per job.
+    """
+    try:
+        parsed_data = parse_resume(io.BytesIO(file_bytes), filename=filename, sandbox=sandbox)
+        if parsed_data.get("error"):
+            return {'error': f'Error processing file: {parsed_data["error"]}'}
+        portfolio_html = generate_portfolio_html(parsed_data)
+        if "Error: Could not generate portfolio" in portfolio_html:
+            return {'error': 'Failed to generate portfolio display from parsed data.'}
+        return {'html_content': portfolio_html, 'extracted_data': parsed_data}
+    except ExtractionError as e:
+        return {'error': f'Error processing file: {e}', 'error_code': e.code}
+    except Exception as e:
+        return {'error': f'Error processing file: {str(e)}'}
+
+
+def _process_alive(pid: int) -> bool:
+    """True if a process with this pid exists (it may belong to another user)."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class JobQueue:
+    """
+    In-process job broker running jobs on a small pool of threads.
+
+    Jobs are kept in a dict guarded by a lock; no external services are needed. The threads only
+    coordinate: process_resume_bytes does the expensive text extraction in an ExtractionSandbox
+    worker process, which is killed if it overruns the sandbox's timeout. At most `max_pending`
+    jobs may be queued or running at once, beyond which submit() raises QueueFullError so callers
+    can apply backpressure.
+
+    A job that has not finished within `timeout` seconds of submission is reported as timed out
+    and its result discarded; if it has not started yet it never runs. One that is already
+    running keeps counting toward `max_pending` until its thread has actually returned (for a
+    stuck extraction, until the sandbox has killed the worker process), so a backlog of hostile
+    documents can't make the queue accept more work than it is able to run. Finished jobs are
+    forgotten `result_ttl` seconds after completion.
+
+    With a `state_dir`, every status change is also written there (one JSON file per job, see
+    ResultCache), so any process sharing the directory can answer get() for a job, e.g. another
+    worker of a pre-forking server or the same worker after it was recycled. A job still queued
+    or running in a process that has exited is reported as failed. `max_pending` and the threads
+    are per process.
+
+    The threads are started on first submit rather than in __init__, so importing the app in a
+    pre-forking server does not start them in the master.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: int = 32,
+                 timeout: float = 60, result_ttl: float = 600, state_dir: Optional[str] = None):
+        self.max_workers = max(1, int(max_workers or 2))
+        self.max_pending = max(1, int(max_pending))
+        self.timeout = timeout
+        self.result_ttl = result_ttl
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        # Reentrant: cancelling a future under the lock runs _on_future_done in the same thread
+        self._lock = threading.RLock()
+        self._executor = None
+        self._executor_pid = None
+        # Disk tier only: each process keeps its own jobs in self._jobs
+        self._store = ResultCache(max_entries=0, ttl=timeout + result_ttl, disk_dir=state_dir) if state_dir else None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Caller must hold self._lock. Threads don't survive a fork, so rebuild the pool per pid.
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def _new_job(self, job_id: str, status: str, now: float, result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return {
+            'job_id': job_id,
+            'status': status,
+            'submitted_at': now,
+            'finished_at': now if status == DONE else None,
+            'owner': os.getpid(),
+            'future': None,
+            'result': result,
+            'error': None,
+            'error_code': None,
+        }
+
+    def _publish(self, job: Dict[str, Any]) -> None:
+        # Caller must hold self._lock, so a job's writes can't overtake each other
+        if self._store is not None:
+            self._store.set(job['job_id'], {key: value for key, value in job.items() if key != 'future'})
+
+    def _refresh(self, job: Dict[str, Any], now: float) -> None:
+        # Caller must hold self._lock
+        if job['status'] not in (QUEUED, RUNNING):
+            return
+        if now - job['submitted_at'] > self.timeout:
+            # A job that hasn't started is dropped from the pool; a running one can't be stopped
+            # from here and still counts as pending until it returns (see _pending_count)
+            if job['future'] is not None and job['future'].cancel():
+                job['future'] = None
+            job['status'] = TIMEOUT
+            job['error'] = f'Job did not finish within {self.timeout:g} seconds.'
+            job['finished_at'] = now
+            self._publish(job)
+
+    def _refresh_stored(self, job: Dict[str, Any], now: float) -> Optional[Dict[str, Any]]:
+        """Applies expiry and timeouts to a job record read from the state directory."""
+        if job['status'] in (QUEUED, RUNNING):
+            if now - job['submitted_at'] > self.timeout:
+                job.update(status=TIMEOUT, error=f'Job did not finish within {self.timeout:g} seconds.')
+            elif not _process_alive(job['owner']):
+                job.update(status=FAILED, error='The server process running this job stopped before it finished.')
+        elif job.get('finished_at') and now - job['finished_at'] > self.result_ttl:
+            return None
+        return job
+
+    def _prune(self, now: float) -> None:
+        # Caller must hold self._lock
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job['future'] is None and job.get('finished_at') and now - job['finished_at'] > self.result_ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _pending_count(self) -> int:
+        # Caller must hold self._lock. Counts every job whose work hasn't returned, including
+        # jobs already reported as timed out.
+        return sum(1 for job in self._jobs.values() if job['future'] is not None)
+
+    def _run(self, job_id: str, fn: Callable, args: tuple) -> Optional[Dict[str, Any]]:
+        """Pool thread entry point: runs the job unless it has timed out while queued."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            self._refresh(job, time.time())
+            if job['status'] != QUEUED:
+                return None
+            job['status'] = RUNNING
+            self._publish(job)
+        return fn(*args)
+
+    def _on_future_done(self, job_id: str, future, on_result: Optional[Callable]) -> None:
+        result = None
+        if not future.cancelled():
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'error': f'Error processing file: {str(e)}'}
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job['future'] = None
+            if result is None or job['status'] != RUNNING:
+                return  # Timed out; the result is discarded
+            job['finished_at'] = time.time()
+            if result.get('error'):
+                job['status'] = FAILED
+                job['error'] = result['error']
+                job['error_code'] = result.get('error_code')
+            else:
+                job['status'] = DONE
+                job['result'] = result
+            self._publish(job)
+            succeeded = job['status'] == DONE
+        if on_result is not None and succeeded:
+            on_result(result)
+
+    def submit(self, fn: Callable, *args, on_result: Optional[Callable] = None) -> str:
+        """
+        Schedules `fn(*args)` on the pool and returns the new job id.
+
+        `fn` must return a dict with either an 'error' key (and optionally an 'error_code') or
+        the job's result, JSON-serializable if the queue has a state_dir. `on_result` is called
+        with successful results.
+        """
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._prune(now)
+            for job in self._jobs.values():
+                self._refresh(job, now)
+            if self._pending_count() >= self.max_pending:
+                raise QueueFullError(f'Job queue is full ({self.max_pending} pending jobs).')
+            job = self._jobs[job_id] = self._new_job(job_id, QUEUED, now)
+            self._publish(job)
+            future = job['future'] = self._get_executor().submit(self._run, job_id, fn, args)
+        future.add_done_callback(lambda f: self._on_future_done(job_id, f, on_result))
+        return job_id
+
+    def add_completed(self, result: Dict[str, Any]) -> str:
+        """Records an already-available result (e.g. a cache hit) as a finished job."""
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._prune(now)
+            job = self._jobs[job_id] = self._new_job(job_id, DONE, now, result=result)
+            self._publish(job)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns a JSON-friendly view of the job, or None if the id is unknown or expired.
+
+        Jobs submitted to another process are looked up in the state directory, if there is one.
+        """
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._refresh(job, now)
+                return self._view(job)
+        stored = self._store.get(job_id) if self._store is not None else None
+        if stored is None:
+            return None
+        job = self._refresh_stored(stored, now)
+        return self._view(job) if job is not None else None
+
+    @staticmethod
+    def _view(job: Dict[str, Any]) -> Dict[str, Any]:
+        view = {'job_id': job['job_id'], 'status': job['status']}
+        if job['status'] == DONE:
+            view.update(job['result'])
+        elif job['error']:
+            view['error'] = job['error']
+            if job['error_code']:
+                view['error_code'] = job['error_code']
+        return view
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns counts by status of this process's jobs plus the queue limits."""
+        now = time.time()
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0, TIMEOUT: 0}
+            for job in self._jobs.values():
+                self._refresh(job, now)
+                counts[job['status']] += 1
+            return {'workers': self.max_workers, 'max_pending': self.max_pending,
+                    'pending': self._pending_count(), 'state_dir': self._store.disk_dir if self._store else None,
+                    'jobs': counts}
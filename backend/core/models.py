@@ -0,0 +1,187 @@
+"""
+Data model for parsed resumes.
+
+Entries keep their text fields as (start, end) offsets into the resume's raw extracted text and
+only slice the strings out when a field is read, so a parsed resume holds little more than its
+raw text instead of a second copy of every description. All classes use __slots__.
+
+Besides attribute access (used by the templates), the classes support the mapping-style access
+(`entry["title"]`, `resume.get("skills")`) the rest of the code used with plain dicts. `to_dict()`
+and `json_default` produce plain JSON-serializable structures.
+"""
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# A text field holds either an offset pair into the source text or a literal string (defaults)
+TextValue = Union[Tuple[int, int], str]
+
+
+class _Text:
+    """Descriptor for a text field kept in the slot `_<name>` as offsets or a literal."""
+
+    def __set_name__(self, owner, name):
+        self.slot = "_" + name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = getattr(instance, self.slot)
+        if isinstance(value, tuple):
+            return instance._source[value[0]:value[1]]
+        return value
+
+    def __set__(self, instance, value: TextValue):
+        setattr(instance, self.slot, value)
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, _Model):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
+
+
+class _Model:
+    __slots__ = ("_source",)
+    FIELDS: Tuple[str, ...] = ()
+    # Text fields stored as offsets; moved by rebase()
+    TEXT_FIELDS: Tuple[str, ...] = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: _plain(getattr(self, name)) for name in self.FIELDS}
+
+    def rebase(self, source: str, delta: int) -> "_Model":
+        """
+        Returns a copy reading from `source`, with every offset moved by `delta`.
+
+        Used when a section is reused unchanged from an earlier parse of an edited text, where the
+        same section text now sits at a different position.
+        """
+        copy = object.__new__(type(self))
+        for slot in type(self).__slots__:
+            setattr(copy, slot, getattr(self, slot))
+        copy._source = source
+        for name in self.TEXT_FIELDS:
+            value = getattr(self, "_" + name)
+            if isinstance(value, tuple):
+                setattr(copy, "_" + name, (value[0] + delta, value[1] + delta))
+        return copy
+
+    def to_state(self) -> Dict[str, Any]:
+        """
+        Returns the object's slots, offsets included, as JSON-serializable data (see from_state).
+
+        Unlike to_dict() this keeps offsets as offsets; the source text is not included.
+        """
+        return {slot: list(value) if isinstance(value, tuple) else value
+                for slot in type(self).__slots__ for value in (getattr(self, slot),)}
+
+    @classmethod
+    def from_state(cls, source: str, state: Dict[str, Any]) -> "_Model":
+        """Rebuilds an object from to_state() output and the text its offsets point into."""
+        obj = object.__new__(cls)
+        obj._source = source
+        for slot in cls.__slots__:
+            value = state[slot]
+            if slot[1:] in cls.TEXT_FIELDS and isinstance(value, list):
+                value = tuple(value)
+            setattr(obj, slot, value)
+        return obj
+
+    def __eq__(self, other):
+        if isinstance(other, _Model):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class ExperienceEntry(_Model):
+    __slots__ = ("_title", "_company", "_description", "dates")
+    FIELDS = ("title", "company", "dates", "description")
+    TEXT_FIELDS = ("title", "company", "description")
+    title = _Text()
+    company = _Text()
+    description = _Text()
+
+    def __init__(self, source: str, title: TextValue, company: TextValue, description: TextValue, dates: str = ""):
+        self._source = source
+        self.title = title
+        self.company = company
+        self.dates = dates
+        self.description = description
+
+
+class EducationEntry(_Model):
+    __slots__ = ("_degree", "_institution", "_details", "dates")
+    FIELDS = ("degree", "institution", "dates", "details")
+    TEXT_FIELDS = ("degree", "institution", "details")
+    degree = _Text()
+    institution = _Text()
+    details = _Text()
+
+    def __init__(self, source: str, degree: TextValue, institution: TextValue, details: TextValue, dates: str = ""):
+        self._source = source
+        self.degree = degree
+        self.institution = institution
+        self.dates = dates
+        self.details = details
+
+
+class Project(_Model):
+    __slots__ = ("_name", "_description", "technologies", "link")
+    FIELDS = ("name", "description", "technologies", "link")
+    TEXT_FIELDS = ("name", "description")
+    name = _Text()
+    description = _Text()
+
+    def __init__(self, source: str, name: TextValue, description: TextValue,
+                 technologies: Optional[List[str]] = None, link: str = ""):
+        self._source = source
+        self.name = name
+        self.description = description
+        self.technologies = technologies if technologies is not None else []
+        self.link = link
+
+
+class Resume(_Model):
+    __slots__ = ("name", "title", "email", "phone", "linkedin", "github", "website", "_summary",
+                 "experience", "education", "skills", "projects", "profile_image_url")
+    FIELDS = ("name", "title", "email", "phone", "linkedin", "github", "website", "summary",
+              "experience", "education", "skills", "projects", "profile_image_url")
+    TEXT_FIELDS = ("summary",)
+    summary = _Text()
+
+    def __init__(self, source: str):
+        self._source = source
+        self.name = "Your Name"
+        self.title = "Professional Title" # Default, can be hard to extract
+        self.email = "your.email@example.com"
+        self.phone = ""
+        self.linkedin = ""
+        self.github = ""
+        self.website = ""
+        self.summary = ""
+        self.experience: List[ExperienceEntry] = []
+        self.education: List[EducationEntry] = []
+        self.skills: List[str] = []
+        self.projects: List[Project] = []
+        self.profile_image_url = "https://images.unsplash.com/photo-1507003211169-0a1dd7228f2d?ixlib=rb-4.0.3&ixid=M3wxMjA3fDB8MHxwaG90by1wYWdlfHx8fGVufDB8fHx8fA%3D%3D&auto=format&fit=crop&w=387&q=80"
+
+
+def json_default(obj: Any) -> Any:
+    """`default` hook for json/orjson that serializes the model classes."""
+    if isinstance(obj, _Model):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
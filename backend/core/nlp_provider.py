@@ -0,0 +1,245 @@
+import gc
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Model to load. Make sure to download it first: python -m spacy download en_core_web_sm
+SPACY_MODEL = os.environ.get('SPACY_MODEL', 'en_core_web_sm')
+
+# _extract_name only reads doc.ents, so everything except the entity recognizer (and the
+# shared tok2vec it may listen to) is excluded at load time rather than merely disabled.
+# Excluded components are never deserialized, which cuts load time and resident memory.
+EXCLUDED_COMPONENTS = ['tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'senter', 'morphologizer']
+
+WARM_UP_TEXT = "Jane Doe\nSenior Software Engineer\njane.doe@example.com\nSan Francisco, CA"
+
+# Defaults for batched processing with pipe(). NLP_N_PROCESS > 1 makes spaCy fork its own workers,
+# which only pays off for large offline batches.
+NLP_BATCH_SIZE = int(os.environ.get('NLP_BATCH_SIZE', 64))
+NLP_N_PROCESS = int(os.environ.get('NLP_N_PROCESS', 1))
+
+
+class DummyNLP:
+    """Stand-in used when the spaCy model is unavailable. Returns docs with no entities."""
+    def __call__(self, text):
+        class DummyDoc:
+            def __init__(self, text):
+                self.text = text
+                self.ents = []
+        return DummyDoc(text)
+
+    def pipe(self, texts, batch_size=None, n_process=1):
+        return (self(text) for text in texts)
+
+
+_nlp = None
+_load_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {
+    "model": SPACY_MODEL,
+    "pipeline": [],
+    "load_seconds": 0.0,
+    "warmed_up": False,
+    "calls": 0,
+    "total_seconds": 0.0,
+    "last_seconds": 0.0,
+    "batches": 0,
+    "batched_docs": 0,
+    "batch_seconds": 0.0,
+}
+
+
+def _load_model():
+    """Loads the spaCy model trimmed to NER. Falls back to DummyNLP if it is not installed."""
+    try:
+        import spacy
+        nlp = spacy.load(SPACY_MODEL, exclude=EXCLUDED_COMPONENTS)
+    except (ImportError, OSError):
+        # This is a fallback for environments where the model might not be downloaded by startup.sh yet
+        # or if spacy.cli.download is not available/working. Production setup should ensure model is present.
+        print(f"spaCy model '{SPACY_MODEL}' not found. Please run 'python -m spacy download {SPACY_MODEL}'")
+        return DummyNLP()
+
+    # In some packaged pipelines NER carries its own embedding layer; then the shared tok2vec
+    # only feeds the components we excluded and can be switched off too.
+    if 'tok2vec' in nlp.pipe_names:
+        listeners = getattr(nlp.get_pipe('tok2vec'), 'listening_components', [])
+        if 'ner' not in listeners:
+            nlp.disable_pipe('tok2vec')
+    return nlp
+
+
+def get_nlp():
+    """Returns the process-wide NLP pipeline, loading it on first use."""
+    global _nlp
+    if _nlp is None:
+        with _load_lock:
+            if _nlp is None:
+                started = time.perf_counter()
+                nlp = _load_model()
+                elapsed = time.perf_counter() - started
+                with _stats_lock:
+                    _stats["load_seconds"] = elapsed
+                    _stats["pipeline"] = list(getattr(nlp, 'pipe_names', []))
+                _nlp = nlp
+    return _nlp
+
+
+def process(text):
+    """
+    Runs the pipeline over `text` and records per-call latency.
+
+    With micro-batching enabled (see enable_micro_batching) the text is queued and processed
+    together with those of concurrent callers; the returned doc is the same either way.
+    """
+    batcher = _micro_batcher
+    started = time.perf_counter()
+    if batcher is not None:
+        doc = batcher.submit(text).result()
+    else:
+        doc = get_nlp()(text)
+    elapsed = time.perf_counter() - started
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["total_seconds"] += elapsed
+        _stats["last_seconds"] = elapsed
+    return doc
+
+
+def pipe(texts: Iterable[str], batch_size: Optional[int] = None, n_process: Optional[int] = None) -> List[Any]:
+    """
+    Runs the pipeline over many texts with nlp.pipe and returns the docs in input order.
+
+    `batch_size` and `n_process` default to NLP_BATCH_SIZE and NLP_N_PROCESS. The docs are the
+    same as those of calling process() on each text.
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+    nlp = get_nlp()
+    started = time.perf_counter()
+    docs = list(nlp.pipe(texts, batch_size=batch_size or NLP_BATCH_SIZE, n_process=n_process or NLP_N_PROCESS))
+    elapsed = time.perf_counter() - started
+    with _stats_lock:
+        _stats["batches"] += 1
+        _stats["batched_docs"] += len(texts)
+        _stats["batch_seconds"] += elapsed
+    return docs
+
+
+class MicroBatcher:
+    """
+    Collects items submitted from many threads and processes them in batches on one thread.
+
+    A batch is started by the first item submitted and runs as soon as it holds `batch_size`
+    items or `max_wait` seconds have passed, whichever comes first. `fn` takes a list of items
+    and returns a list of results in the same order. The thread is started on first submit in
+    each process, so creating a batcher before a pre-forking server forks is safe.
+    """
+
+    def __init__(self, fn: Callable[[List[Any]], List[Any]], batch_size: int = 32, max_wait: float = 0.002):
+        self.fn = fn
+        self.batch_size = max(1, int(batch_size))
+        self.max_wait = max(0.0, max_wait)
+        self._queue = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        # A thread (and the queue it reads) doesn't survive fork, so start one per pid
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._queue = queue.SimpleQueue()
+                    threading.Thread(target=self._run, args=(self._queue,), name="nlp-micro-batcher", daemon=True).start()
+                    self._pid = os.getpid()
+        return self._queue
+
+    def submit(self, item: Any) -> Future:
+        """Queues `item` and returns a Future for its result."""
+        future = Future()
+        self._ensure_started().put((item, future))
+        return future
+
+    def _run(self, pending):
+        while True:
+            batch = [pending.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(pending.get(timeout=remaining) if remaining > 0 else pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                results = self.fn([item for item, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+
+_micro_batcher = None
+
+
+def enable_micro_batching(max_wait: float = 0.001, batch_size: Optional[int] = None) -> None:
+    """
+    Routes process() through a MicroBatcher backed by pipe() (n_process=1).
+
+    Concurrent callers then share one nlp.pipe call instead of each running the pipeline on its
+    own. A batch waits at most `max_wait` seconds for more callers; with 0 it takes only the
+    texts already queued, which still batches whatever arrives while the previous batch runs.
+    """
+    global _micro_batcher
+    _micro_batcher = MicroBatcher(lambda texts: pipe(texts, batch_size=len(texts), n_process=1),
+                                  batch_size=batch_size or NLP_BATCH_SIZE, max_wait=max_wait)
+
+
+def disable_micro_batching() -> None:
+    """Makes process() run the pipeline in the calling thread again."""
+    global _micro_batcher
+    _micro_batcher = None
+
+
+def warm_up():
+    """Runs a small document through the pipeline so the first real request doesn't pay for lazy init."""
+    nlp = get_nlp()
+    nlp(WARM_UP_TEXT)
+    with _stats_lock:
+        _stats["warmed_up"] = True
+
+
+def preload(freeze=False):
+    """
+    Loads and warms the pipeline in the current process.
+
+    Call this before forking workers (e.g. at import time under gunicorn --preload) so the model
+    is shared copy-on-write. With `freeze=True`, everything allocated so far is moved to the
+    permanent GC generation; otherwise the collector's reference-count writes would touch the
+    model's pages in every child and gradually un-share them.
+    """
+    warm_up()
+    if freeze and hasattr(gc, 'freeze'):
+        gc.collect()
+        gc.freeze()
+
+
+def is_ready():
+    """True once the pipeline has been loaded and warmed up."""
+    with _stats_lock:
+        return _nlp is not None and _stats["warmed_up"]
+
+
+def stats() -> Dict[str, Any]:
+    """Returns a snapshot of load time and per-call latency counters."""
+    with _stats_lock:
+        snapshot = dict(_stats)
+    snapshot["pipeline"] = list(snapshot["pipeline"])
+    snapshot["mean_seconds"] = (snapshot["total_seconds"] / snapshot["calls"]) if snapshot["calls"] else 0.0
+    snapshot["micro_batching"] = _micro_batcher is not None
+    return snapshot
@@ -1,9 +1,188 @@
 import datetime
-from jinja2 import Environment, FileSystemLoader, select_autoescape, exceptions as jinja_exceptions
+import hashlib
+import json
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, select_autoescape, exceptions as jinja_exceptions, nodes
 import os
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, Optional
 
-def generate_portfolio_html(data: Dict[str, Any], template_name: str = "generated_portfolio_template.html") -> str:
+from .metrics import stage_timer
+from .models import json_default
+from .result_cache import ResultCache
+
+# Determine the absolute path to the templates directory
+# __file__ is backend/core/portfolio_generator.py
+# os.path.dirname(__file__) is backend/core/
+# os.path.join(..., '..', 'templates') is backend/templates/
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), '..', 'templates')
+
+# Templates are only re-checked on disk when this is enabled (useful while editing them locally).
+TEMPLATE_AUTO_RELOAD = os.environ.get('TEMPLATE_AUTO_RELOAD', '0') == '1'
+# Compiled template bytecode is cached here so a restarted process skips parsing/compiling.
+# Leave unset to use Jinja's per-user temp directory, or set to 'off' to disable.
+TEMPLATE_BYTECODE_CACHE_DIR = os.environ.get('TEMPLATE_BYTECODE_CACHE_DIR')
+
+PORTFOLIO_TEMPLATE = "generated_portfolio_template.html"
+# Rendered section fragments kept per process, keyed by a hash of the data each one reads.
+# 0 disables fragment caching (the whole template is rendered on every call).
+FRAGMENT_CACHE_SIZE = int(os.environ.get('FRAGMENT_CACHE_SIZE', 512))
+
+def _data_keys(*keys):
+    return lambda data, current_year: [data.get(key) for key in keys]
+
+_SECTION_KEYS = ("experience", "education", "skills", "projects")
+
+# The fragments PORTFOLIO_TEMPLATE includes, in order, each with a function returning the slice of
+# the render context it depends on. Fragments without one read no data (static chrome) and are
+# rendered once per process. Keep this list in step with the includes in the template: if they
+# differ, _fragments_match_template() reports it and the whole template is rendered instead.
+PORTFOLIO_FRAGMENTS = [
+    ("portfolio/document_start.html", None),
+    ("portfolio/title.html", _data_keys("name")),
+    ("portfolio/styles.html", None),
+    # The nav only shows links for sections that have entries
+    ("portfolio/nav.html", lambda data, current_year: [data.get("name")] + [bool(data.get(key)) for key in _SECTION_KEYS]),
+    ("portfolio/hero.html", _data_keys("profile_image_url", "name", "title", "summary")),
+    ("portfolio/experience.html", _data_keys("experience")),
+    ("portfolio/education.html", _data_keys("education")),
+    ("portfolio/skills.html", _data_keys("skills")),
+    ("portfolio/projects.html", _data_keys("projects")),
+    ("portfolio/contact.html", _data_keys("email", "phone", "linkedin", "github", "website")),
+    ("portfolio/footer.html", lambda data, current_year: [data.get("name"), current_year]),
+    ("portfolio/document_end.html", None),
+]
+
+fragment_cache = ResultCache(max_entries=FRAGMENT_CACHE_SIZE, ttl=None)
+_static_fragments: Dict[str, str] = {}
+_fragments_match: Optional[bool] = None
+
+_env: Optional[Environment] = None
+_env_lock = threading.Lock()
+
+def _create_environment() -> Environment:
+    bytecode_cache = None
+    if TEMPLATE_BYTECODE_CACHE_DIR != 'off':
+        try:
+            if TEMPLATE_BYTECODE_CACHE_DIR:
+                os.makedirs(TEMPLATE_BYTECODE_CACHE_DIR, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(TEMPLATE_BYTECODE_CACHE_DIR or None)
+        except (OSError, RuntimeError) as e:
+            print(f"Template bytecode cache disabled: {e}")
+
+    return Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=select_autoescape(['html', 'xml']),
+        trim_blocks=True, # Removes the first newline after a block
+        lstrip_blocks=True, # Strips leading whitespace from a block
+        auto_reload=TEMPLATE_AUTO_RELOAD,
+        bytecode_cache=bytecode_cache
+    )
+
+def get_environment() -> Environment:
+    """
+    Returns the process-wide Jinja2 environment, creating it on first use.
+
+    The environment keeps compiled templates in memory, so each template is parsed once per
+    process instead of on every render. Rendering from it is thread-safe.
+    """
+    global _env
+    if _env is None:
+        with _env_lock:
+            if _env is None:
+                _env = _create_environment()
+    return _env
+
+def precompile_templates() -> int:
+    """
+    Eagerly loads and compiles every template in the templates directory.
+
+    Intended to be called at startup (before forking workers) so no request pays for
+    compilation. Also checks PORTFOLIO_FRAGMENTS against the portfolio template, so a mismatch
+    is reported at startup. Returns the number of templates compiled.
+    """
+    env = get_environment()
+    compiled = 0
+    for template_name in env.list_templates():
+        try:
+            env.get_template(template_name)
+            compiled += 1
+        except Exception as e:
+            print(f"Error precompiling template {template_name}: {e}")
+    if FRAGMENT_CACHE_SIZE and not TEMPLATE_AUTO_RELOAD:
+        _fragments_match_template(env)
+    return compiled
+
+def _fragments_match_template(env: Environment) -> bool:
+    """
+    True if PORTFOLIO_TEMPLATE is nothing but the includes listed in PORTFOLIO_FRAGMENTS, in order.
+
+    Checked once per process (fragments are only used while templates can't change). A mismatch
+    is printed, and fragment rendering is then skipped, since it would build a different page.
+    """
+    global _fragments_match
+    if _fragments_match is None:
+        expected = [fragment for fragment, _ in PORTFOLIO_FRAGMENTS]
+        try:
+            body = env.parse(env.loader.get_source(env, PORTFOLIO_TEMPLATE)[0]).body
+            includes = [node.template.value if isinstance(node, nodes.Include) and isinstance(node.template, nodes.Const)
+                        else None
+                        for node in body
+                        if not (isinstance(node, nodes.Output)
+                                and all(isinstance(child, nodes.TemplateData) and not child.data.strip() for child in node.nodes))]
+        except Exception as e:
+            print(f"Error reading the includes of {PORTFOLIO_TEMPLATE}: {e}")
+            includes = None
+        _fragments_match = includes == expected
+        if not _fragments_match:
+            print(f"Error: PORTFOLIO_FRAGMENTS does not match the includes of {PORTFOLIO_TEMPLATE} "
+                  f"({includes} vs {expected}); rendering the whole template instead of fragments.")
+    return _fragments_match
+
+def get_template_version(template_name: str = PORTFOLIO_TEMPLATE) -> str:
+    """
+    Returns a cheap version string for a template, derived from its modification time and size.
+
+    For the portfolio template the fragments it includes are covered too. Used in result cache
+    keys so editing a template invalidates previously rendered HTML.
+    """
+    names = [template_name]
+    if template_name == PORTFOLIO_TEMPLATE:
+        names += [fragment for fragment, _ in PORTFOLIO_FRAGMENTS]
+    versions = []
+    for name in names:
+        try:
+            stat = os.stat(os.path.join(TEMPLATE_DIR, name))
+        except OSError:
+            return "missing"
+        versions.append(f"{int(stat.st_mtime)}-{stat.st_size}")
+    return versions[0] if len(versions) == 1 else hashlib.sha1(",".join(versions).encode()).hexdigest()[:16]
+
+def _render_fragments(env: Environment, data: Dict[str, Any], current_year: int) -> str:
+    """
+    Renders PORTFOLIO_TEMPLATE fragment by fragment, reusing fragments rendered earlier.
+
+    Static chrome is rendered once per process; every other fragment is looked up in
+    fragment_cache by a hash of its slice of `data`, so re-rendering after an edit to one section
+    (or rendering a batch of resumes sharing sections) only renders what changed. The result is
+    identical to rendering the whole template.
+    """
+    parts = []
+    for fragment, data_slice in PORTFOLIO_FRAGMENTS:
+        if data_slice is None:
+            html = _static_fragments.get(fragment)
+            if html is None:
+                html = _static_fragments[fragment] = env.get_template(fragment).render(data={}, current_year=current_year)
+        else:
+            digest = hashlib.sha1(json.dumps(data_slice(data, current_year), sort_keys=True, default=json_default).encode("utf-8"))
+            key = f"{fragment}:{digest.hexdigest()}"
+            html = fragment_cache.get(key)
+            if html is None:
+                html = env.get_template(fragment).render(data=data, current_year=current_year)
+                fragment_cache.set(key, html)
+        parts.append(html)
+    return "".join(parts)
+
+def generate_portfolio_html(data: Dict[str, Any], template_name: str = PORTFOLIO_TEMPLATE) -> str:
     """
     Generates portfolio HTML content using Jinja2 templating.
 
@@ -19,24 +198,19 @@ def generate_portfolio_html(data: Dict[str, Any], template_name: str = "generate
         str: The rendered HTML content as a string.
              Returns an error message string if the template is not found or rendering failed.
     """
-    # Determine the absolute path to the templates directory
-    # __file__ is backend/core/portfolio_generator.py
-    # os.path.dirname(__file__) is backend/core/
-    # os.path.join(..., '..', 'templates') is backend/templates/
-    template_dir = os.path.join(os.path.dirname(__file__), '..', 'templates')
-    
-    env = Environment(
-        loader=FileSystemLoader(template_dir),
-        autoescape=select_autoescape(['html', 'xml']),
-        trim_blocks=True, # Removes the first newline after a block
-        lstrip_blocks=True # Strips leading whitespace from a block
-    )
+    template_dir = TEMPLATE_DIR
+    env = get_environment()
     
     try:
-        template = env.get_template(template_name)
-        current_year = datetime.datetime.now().year
-        # The template expects the data to be passed as 'data' and 'current_year'.
-        return template.render(data=data, current_year=current_year)
+        with stage_timer("render"):
+            current_year = datetime.datetime.now().year
+            # Fragments are only reused while templates can't change under us
+            if (template_name == PORTFOLIO_TEMPLATE and FRAGMENT_CACHE_SIZE and not TEMPLATE_AUTO_RELOAD
+                    and _fragments_match_template(env)):
+                return _render_fragments(env, data, current_year)
+            template = env.get_template(template_name)
+            # The template expects the data to be passed as 'data' and 'current_year'.
+            return template.render(data=data, current_year=current_year)
     except jinja_exceptions.TemplateNotFound:
         print(f"Error: Template '{template_name}' not found in directory '{template_dir}'.")
         return f"<p>Error: Could not generate portfolio. Template '{template_name}' not found.</p>"
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, BinaryIO, Dict, Optional, Union
+
+from .models import json_default
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def make_cache_key(file_bytes: Union[bytes, BinaryIO], extension: str, *versions: str) -> str:
+    """
+    Builds a cache key from the uploaded file contents.
+
+    `file_bytes` may be the raw bytes or a seekable binary file object, which is hashed in chunks
+    and rewound afterwards so large spooled uploads are never read into memory at once.
+
+    The key covers the raw bytes, the file extension (the same bytes are parsed
+    differently as PDF or DOCX) and any version strings passed in, so bumping the
+    parser or template version naturally invalidates older entries.
+    """
+    hasher = hashlib.sha256()
+    if isinstance(file_bytes, (bytes, bytearray)):
+        hasher.update(file_bytes)
+    else:
+        for chunk in iter(lambda: file_bytes.read(HASH_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+        file_bytes.seek(0)
+    hasher.update(b"\0" + extension.lower().encode("utf-8"))
+    for version in versions:
+        hasher.update(b"\0" + str(version).encode("utf-8"))
+    return hasher.hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache for processed resume results.
+
+    The first tier is a bounded in-memory LRU. The optional second tier stores one
+    JSON file per key in `disk_dir`, so results survive a restart and can be shared
+    between worker processes on the same host. Entries older than `ttl` seconds are
+    treated as missing in both tiers (a ttl of 0 or None disables expiry).
+
+    Values may hold core.models objects. The memory tier keeps them as they are; the disk tier
+    stores their to_dict() form, so an entry read back from disk has plain dicts instead.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl: Optional[float] = 3600,
+                 disk_dir: Optional[str] = None):
+        self.max_entries = max(0, int(max_entries))
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self.disk_dir = disk_dir
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.disk_dir:
+            try:
+                os.makedirs(self.disk_dir, exist_ok=True)
+            except OSError as e:
+                print(f"Error creating result cache directory {self.disk_dir}: {e}")
+                self.disk_dir = None
+
+    def _is_expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl is not None and now - stored_at > self.ttl
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _remember(self, key: str, value: Dict[str, Any], stored_at: float) -> None:
+        # Caller must hold self._lock
+        if self.max_entries == 0:
+            return
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _read_disk(self, key: str, now: float) -> Optional[tuple]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Error reading result cache entry {path}: {e}")
+            return None
+        stored_at = payload.get("stored_at", 0)
+        if self._is_expired(stored_at, now):
+            self._remove_disk(key)
+            return None
+        return stored_at, payload.get("value")
+
+    def _write_disk(self, key: str, value: Dict[str, Any], stored_at: float) -> None:
+        if not self.disk_dir:
+            return
+        # Write to a temp file and rename so concurrent readers never see a partial entry
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": stored_at, "value": value}, f, default=json_default)
+            os.replace(tmp_path, self._disk_path(key))
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Error writing result cache entry for {key}: {e}")
+
+    def _remove_disk(self, key: str) -> None:
+        try:
+            os.remove(self._disk_path(key))
+        except OSError:
+            pass
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns the cached value for `key`, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if not self._is_expired(stored_at, now):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.evictions += 1
+
+        disk_entry = self._read_disk(key, now)
+        with self._lock:
+            if disk_entry is not None and disk_entry[1] is not None:
+                stored_at, value = disk_entry
+                self._remember(key, value, stored_at)
+                self.hits += 1
+                self.disk_hits += 1
+                return value
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Stores `value` (a JSON-serializable dict) under `key` in both tiers."""
+        stored_at = time.time()
+        with self._lock:
+            self._remember(key, value, stored_at)
+        self._write_disk(key, value, stored_at)
+
+    def clear(self) -> None:
+        """Drops every entry from memory and disk. Counters are left untouched."""
+        with self._lock:
+            self._entries.clear()
+        if self.disk_dir:
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(".json"):
+                    self._remove_disk(name[:-len(".json")])
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns a snapshot of the cache counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "disk_dir": self.disk_dir,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            }
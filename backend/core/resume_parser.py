@@ -1,32 +1,58 @@
 import os
+import posixpath
 import re
-import spacy
+import zipfile
+from xml.etree.ElementTree import iterparse
 from docx import Document
 from pdfminer.high_level import extract_text
 
-# Load the spaCy model. Make sure to download it first: python -m spacy download en_core_web_sm
-try:
-    nlp = spacy.load('en_core_web_sm')
-except OSError:
-    # This is a fallback for environments where the model might not be downloaded by startup.sh yet
-    # or if spacy.cli.download is not available/working. Production setup should ensure model is present.
-    print("spaCy model 'en_core_web_sm' not found. Please run 'python -m spacy download en_core_web_sm'")
-    # A dummy nlp object to avoid crashing, though NER will not work.
-    class DummyNLP:
-        def __call__(self, text):
-            class DummyDoc:
-                def __init__(self, text):
-                    self.text = text
-                    self.ents = []
-            return DummyDoc(text)
-    nlp = DummyNLP()
-
-# Regex patterns for contact information
-EMAIL_REGEX = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"
-PHONE_REGEX = r"(?:\+?\d{1,3}[-\s\(\)]?)?(?:\d{2,4}[-\s\(\)]?){2,}\d{3,4}" # Simplified phone regex
-LINKEDIN_REGEX = r"linkedin\.com/in/(\w[-_\w]*)"
-GITHUB_REGEX = r"github\.com/(\w[-_\w]*)"
-WEBSITE_REGEX = r"https?://(?:www\.)?([a-zA-Z0-9-]+(?:\.[a-zA-Z]+)+)(?:/[^\s]*)?"
+from . import nlp_provider
+from .models import EducationEntry, ExperienceEntry, Project, Resume
+from .metrics import stage_timer
+
+# Bump whenever a parsing change alters the extracted output, so cached results are invalidated
+PARSER_VERSION = "4"
+
+# PDF extraction settings
+# PDF_MAX_PAGES caps how many pages pdfminer lays out and extracts; everything after the cap is
+# ignored, so sections running past it are cut short. It bounds the cost of very long uploads.
+PDF_MAX_PAGES = int(os.environ.get('PDF_MAX_PAGES', 0)) # 0 = no limit
+
+# DOCX extraction settings
+# 'stream' reads word/document.xml straight from the zip with iterparse and includes table cells.
+# 'python-docx' loads the whole Document and joins its top-level paragraphs (the original behaviour).
+DOCX_EXTRACTION_MODE = os.environ.get('DOCX_EXTRACTION_MODE', 'stream')
+
+# Extraction settings change the extracted text, so they are part of the version used in cache keys
+PARSER_CACHE_VERSION = f"{PARSER_VERSION}:{PDF_MAX_PAGES}:{DOCX_EXTRACTION_MODE}"
+
+# WordprocessingML names used by the streaming DOCX reader
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+_PACKAGE_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+# Run content and its text equivalent, as python-docx's Run.text translates it (w:t is its text)
+_RUN_TEXT = {_W + "tab": "\t", _W + "ptab": "\t", _W + "cr": "\n", _W + "noBreakHyphen": "-"}
+# Subtrees without body text: images and shapes (text boxes included), and the duplicate
+# markup-compatibility fallback of content that is already read from its mc:Choice
+_SKIPPED_ELEMENTS = {_W + "drawing", _W + "pict", _W + "object", _MC_FALLBACK}
+
+# Contact scanner: one precompiled pattern finds every kind of contact detail in a single pass.
+# Each alternative starts on a literal or a token boundary and every repetition is bounded, so a
+# scan is linear in the text length even on long digit tables or '@'-heavy text.
+CONTACT_REGEX = re.compile(r"""
+    (?P<website>https?://(?:www\.)?(?P<domain>[a-zA-Z0-9-]{1,63}(?:\.[a-zA-Z]{1,63}){1,8})(?:/\S{0,2048})?)
+  | linkedin\.com/in/(?P<linkedin>\w[-\w]{0,99})
+  | github\.com/(?P<github>\w[-\w]{0,99})
+  | (?P<email>(?<![a-zA-Z0-9._%+-])[a-zA-Z0-9._%+-]{1,64}@[a-zA-Z0-9.-]{1,253}\.[a-zA-Z]{2,63})
+  | (?P<phone>(?<![\d+(])[+(]?\d(?:[-.\ \t()]{0,2}\d){6,14}(?!\d))
+""", re.IGNORECASE | re.VERBOSE)
+# Profile links written as full URLs are matched by the website alternative; these pull the user out
+LINKEDIN_URL_REGEX = re.compile(r"linkedin\.com/in/(\w[-\w]{0,99})", re.IGNORECASE)
+GITHUB_URL_REGEX = re.compile(r"github\.com/(\w[-\w]{0,99})", re.IGNORECASE)
+# Guard against pathological inputs: only this many characters are scanned for contact details
+CONTACT_SCAN_MAX_CHARS = int(os.environ.get('CONTACT_SCAN_MAX_CHARS', 200000))
+GENERIC_SOCIAL_DOMAINS = ('linkedin.com', 'github.com', 'twitter.com', 'facebook.com')
 
 # Keywords for sections
 EXPERIENCE_KEYWORDS = ['experience', 'work history', 'employment history', 'professional experience']
@@ -35,26 +61,133 @@ SKILLS_KEYWORDS = ['skills', 'technical skills', 'proficiencies', 'core competen
 PROJECTS_KEYWORDS = ['projects', 'personal projects', 'portfolio']
 SUMMARY_KEYWORDS = ['summary', 'profile', 'about me', 'objective']
 
-def _extract_text_from_pdf(file_path):
-    """Extracts text content from a PDF file."""
+def _read_pdf_text(file_path, max_pages=None):
+    """Like _extract_text_from_pdf, but lets extraction errors propagate."""
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    return extract_text(file_path, maxpages=max_pages)
+
+def _docx_main_part(zf):
+    """Name of the main document part, from the package relationships (usually word/document.xml)."""
     try:
-        return extract_text(file_path)
+        with zf.open("_rels/.rels") as rels:
+            for _, elem in iterparse(rels):
+                if elem.tag == _PACKAGE_REL and elem.get("Type") == _OFFICE_DOCUMENT_REL:
+                    return posixpath.normpath(elem.get("Target").lstrip("/"))
+    except KeyError:
+        pass
+    return "word/document.xml"
+
+def _extract_text_from_docx_stream(file_path):
+    """
+    Streams the text of a DOCX file's main document part, one line per paragraph.
+
+    Paragraphs are read in document order wherever they are: the body, table cells (so tables
+    come out cell by cell, row by row) and content controls. A paragraph's text is built like
+    python-docx's Paragraph.text, so a document without tables gives the same text as the
+    'python-docx' mode. Headers, footers, styles and media are separate parts and never read;
+    images and text boxes inside the document are skipped. Finished paragraphs and tables are
+    dropped from the tree as soon as they are read, so memory stays flat for long documents.
+    """
+    lines = []
+    parts = []
+    stack = []
+    run_depth = 0
+    skip_depth = 0
+    with zipfile.ZipFile(file_path) as zf, zf.open(_docx_main_part(zf)) as document:
+        for event, elem in iterparse(document, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                stack.append(elem)
+                if tag in _SKIPPED_ELEMENTS:
+                    skip_depth += 1
+                elif tag == _W + "r" and not skip_depth:
+                    # Runs inside a skipped subtree are ignored on both events, so they can't
+                    # leave run_depth raised for the rest of the document
+                    run_depth += 1
+                continue
+
+            stack.pop()
+            if tag in _SKIPPED_ELEMENTS:
+                skip_depth -= 1
+            elif skip_depth:
+                pass
+            elif tag == _W + "r":
+                run_depth -= 1
+            elif run_depth:
+                if tag == _W + "t":
+                    parts.append(elem.text or "")
+                elif tag == _W + "br":
+                    if elem.get(_W + "type", "textWrapping") == "textWrapping":
+                        parts.append("\n")
+                elif tag in _RUN_TEXT:
+                    parts.append(_RUN_TEXT[tag])
+            elif tag == _W + "p":
+                lines.append("".join(parts))
+                parts = []
+
+            if tag in (_W + "p", _W + "tbl") and stack:
+                stack[-1].remove(elem)
+    return "\n".join(lines)
+
+def _read_docx_text(file_path, mode=None):
+    """Like _extract_text_from_docx, but lets extraction errors propagate."""
+    if (mode or DOCX_EXTRACTION_MODE) == 'stream':
+        return _extract_text_from_docx_stream(file_path)
+    doc = Document(file_path)
+    return "\n".join([para.text for para in doc.paragraphs])
+
+def _read_document_text(file_path, extension):
+    """
+    Extracts the text of a PDF or DOCX file by extension, raising on malformed documents.
+
+    This is what the extraction sandbox (core.extraction_sandbox) runs in its worker processes.
+    """
+    if extension.lower() == '.pdf':
+        return _read_pdf_text(file_path)
+    elif extension.lower() == '.docx':
+        return _read_docx_text(file_path)
+    raise ValueError("Unsupported file type. Only PDF and DOCX are supported.")
+
+def _extract_text_from_pdf(file_path, max_pages=None):
+    """
+    Extracts text content from a PDF file (a path or a seekable binary file object).
+
+    `max_pages` overrides PDF_MAX_PAGES.
+    """
+    try:
+        return _read_pdf_text(file_path, max_pages=max_pages)
     except Exception as e:
         print(f"Error extracting text from PDF {file_path}: {e}")
         return ""
 
-def _extract_text_from_docx(file_path):
-    """Extracts text content from a DOCX file."""
+def _extract_text_from_docx(file_path, mode=None):
+    """
+    Extracts text content from a DOCX file (a path or a seekable binary file object).
+
+    `mode` overrides DOCX_EXTRACTION_MODE ('stream' or 'python-docx').
+    """
     try:
-        doc = Document(file_path)
-        return "\n".join([para.text for para in doc.paragraphs])
+        return _read_docx_text(file_path, mode=mode)
     except Exception as e:
         print(f"Error extracting text from DOCX {file_path}: {e}")
         return ""
 
 def _extract_name(text):
     """Extracts a person's name using spaCy NER."""
-    doc = nlp(text)
+    return _name_from_doc(nlp_provider.process(text), text)
+
+def extract_names(texts, batch_size=None, n_process=None):
+    """
+    Batched _extract_name: runs many header snippets (see name_candidate_text) through nlp.pipe.
+
+    Returns the names in input order, identical to calling _extract_name on each text.
+    `batch_size` and `n_process` are passed to nlp_provider.pipe.
+    """
+    texts = list(texts)
+    docs = nlp_provider.pipe(texts, batch_size=batch_size, n_process=n_process)
+    return [_name_from_doc(doc, text) for doc, text in zip(docs, texts)]
+
+def _name_from_doc(doc, text):
     for ent in doc.ents:
         if ent.label_ == 'PERSON':
             # Take the first PERSON entity found, often at the beginning
@@ -69,213 +202,427 @@ def _extract_name(text):
     return "Your Name" # Default
 
 def _extract_contact_info(text):
-    """Extracts contact information using regex."""
-    emails = list(set(re.findall(EMAIL_REGEX, text, re.IGNORECASE)))
-    phones = list(set(re.findall(PHONE_REGEX, text)))
-    
-    linkedin_user = None
-    linkedin_match = re.search(LINKEDIN_REGEX, text, re.IGNORECASE)
-    if linkedin_match and linkedin_match.group(1):
-        linkedin_user = f"linkedin.com/in/{linkedin_match.group(1)}"
-
-    github_user = None
-    github_match = re.search(GITHUB_REGEX, text, re.IGNORECASE)
-    if github_match and github_match.group(1):
-        github_user = f"github.com/{github_match.group(1)}"
-
-    websites = list(set(re.findall(WEBSITE_REGEX, text, re.IGNORECASE)))
-    # Filter out common social media domains if they are not the primary website
-    generic_social = ['linkedin.com', 'github.com', 'twitter.com', 'facebook.com']
-    personal_website = next((w[0] for w in websites if not any(social in w[0] for social in generic_social)), None)
-    if personal_website and not personal_website.startswith(('http', 'https')):
-        personal_website = 'http://' + personal_website
+    """
+    Extracts contact information in a single pass of CONTACT_REGEX.
+
+    The first email, phone, profile and website seen in the text win, so the result is
+    deterministic for a given document.
+    """
+    found = {}
+    for match in CONTACT_REGEX.finditer(text, 0, CONTACT_SCAN_MAX_CHARS):
+        kind = match.lastgroup
+        if kind == "website":
+            domain = match.group("domain").lower()
+            if "linkedin.com" in domain or "github.com" in domain:
+                profile = LINKEDIN_URL_REGEX.search(match.group()) or GITHUB_URL_REGEX.search(match.group())
+                if profile:
+                    found.setdefault("linkedin" if "linkedin.com" in domain else "github", profile.group(1))
+                continue
+            # Filter out common social media domains, they are not the primary website
+            if any(social in domain for social in GENERIC_SOCIAL_DOMAINS):
+                continue
+            found.setdefault("website", 'http://' + match.group("domain"))
+        else:
+            found.setdefault(kind, match.group(kind))
 
     return {
-        "email": emails[0] if emails else "your.email@example.com",
-        "phone": phones[0] if phones else "+1234567890",
-        "linkedin": linkedin_user or "your-linkedin-profile",
-        "github": github_user or "your-github-profile",
-        "website": personal_website or "yourpersonal.website"
+        "email": found.get("email", "your.email@example.com"),
+        "phone": found.get("phone", "+1234567890"),
+        "linkedin": f"linkedin.com/in/{found['linkedin']}" if "linkedin" in found else "your-linkedin-profile",
+        "github": f"github.com/{found['github']}" if "github" in found else "your-github-profile",
+        "website": found.get("website", "yourpersonal.website")
     }
 
-def _find_section_content(text, keywords, next_section_keywords_lists=None):
-    """Rudimentary section content extraction based on keywords."""
+# Sections in the order parse_resume fills them, and for each one the sections whose heading ends it.
+# A section's own keywords never end it, so e.g. a repeated "Experience" line stays inside the block.
+SECTION_KEYWORDS = {
+    "summary": SUMMARY_KEYWORDS,
+    "experience": EXPERIENCE_KEYWORDS,
+    "education": EDUCATION_KEYWORDS,
+    "skills": SKILLS_KEYWORDS,
+    "projects": PROJECTS_KEYWORDS,
+}
+SECTION_BOUNDARIES = {
+    "summary": ["experience", "education", "skills", "projects"],
+    "experience": ["education", "skills", "projects"],
+    "education": ["skills", "projects", "experience"], # Experience might appear after education too
+    "skills": ["projects", "experience", "education"],
+    "projects": ["experience", "education", "skills"], # Check against other sections
+}
+
+_KEYWORD_TO_SECTION = {kw: name for name, kws in SECTION_KEYWORDS.items() for kw in kws}
+# Longest keywords first so the alternation never stops at a shorter keyword sharing a prefix
+_HEADING_ALTERNATION = "|".join(re.escape(kw) for kw in sorted(_KEYWORD_TO_SECTION, key=len, reverse=True))
+# A heading is a keyword alone on its line, optionally followed by a colon
+_HEADING_REGEX = re.compile(r"(^|\n)\s*(" + _HEADING_ALTERNATION + r")\s*($|\n|:)", re.MULTILINE)
+# The same heading anchored at an arbitrary offset, used for text right after another heading's colon
+_HEADING_AT_REGEX = re.compile(r"\s*(" + _HEADING_ALTERNATION + r")\s*($|\n|:)", re.MULTILINE)
+
+def _earliest_heading_start(text_lower, heading_start, lower_bound):
+    """
+    Moves a heading match back to the earliest line break of the blank run in front of it.
+
+    finditer never reports overlapping matches, so a heading preceded by blank lines can start
+    later than where a standalone search from `lower_bound` would place it. Cutting a section at
+    the earliest point keeps section bodies exactly as the per-section searches produced them.
+    """
+    run_start = heading_start
+    while run_start > lower_bound and text_lower[run_start - 1].isspace():
+        run_start -= 1
+    if run_start == lower_bound:
+        return lower_bound
+    line_break = text_lower.find("\n", run_start, heading_start + 1)
+    return line_break if line_break != -1 else heading_start
+
+def _segment_sections(text):
+    """
+    Splits the text into section spans with a single scan over all heading keywords.
+
+    Returns a list of (section_name, start, end) tuples ordered by start, where text[start:end]
+    is the section body (heading excluded). Sections without a heading are omitted.
+
+    A section starts after the first heading of its highest-priority keyword (keyword order in
+    SECTION_KEYWORDS matters, not position) and ends at the first heading of any section listed
+    in SECTION_BOUNDARIES that follows it, or at the end of the text.
+    """
     text_lower = text.lower()
-    start_index = -1
-    
-    for keyword in keywords:
-        match = re.search(r"(^|\n)\s*" + re.escape(keyword) + r"\s*($|\n|:)", text_lower, re.MULTILINE)
-        if match:
-            start_index = match.end()
-            break
-    
-    if start_index == -1:
-        return ""
-
-    end_index = len(text)
-    if next_section_keywords_lists:
-        for kw_list in next_section_keywords_lists:
-            for kw in kw_list:
-                # Search for the start of the next section
-                next_match = re.search(r"(^|\n)\s*" + re.escape(kw) + r"\s*($|\n|:)", text_lower[start_index:], re.MULTILINE)
-                if next_match:
-                    current_end_index = start_index + next_match.start()
-                    if current_end_index < end_index:
-                        end_index = current_end_index
-                        
-    section_text = text[start_index:end_index].strip()
-    # Clean up common resume section formatting (e.g., remove the title itself if it was included)
-    # This is tricky and highly dependent on resume format.
-    # For now, just return the block.
-    return section_text
-
-def _parse_experience(text_block):
+    headings = [(m.group(2), m.start(), m.end()) for m in _HEADING_REGEX.finditer(text_lower)]
+
+    first_heading_end = {}
+    for keyword, _, heading_end in headings:
+        first_heading_end.setdefault(keyword, heading_end)
+
+    sections = []
+    for name, keywords in SECTION_KEYWORDS.items():
+        start_index = next((first_heading_end[kw] for kw in keywords if kw in first_heading_end), -1)
+        if start_index == -1:
+            continue
+
+        boundaries = SECTION_BOUNDARIES[name]
+        end_index = len(text)
+        # A boundary keyword directly after this heading's colon (e.g. "Summary: Experience")
+        # is not at a line start, but still closes the section immediately
+        inline = _HEADING_AT_REGEX.match(text_lower, start_index)
+        if inline and _KEYWORD_TO_SECTION[inline.group(1)] in boundaries:
+            end_index = start_index
+        else:
+            for keyword, heading_start, _ in headings:
+                if heading_start >= start_index and _KEYWORD_TO_SECTION[keyword] in boundaries:
+                    end_index = _earliest_heading_start(text_lower, heading_start, start_index)
+                    break
+        sections.append((name, start_index, end_index))
+
+    sections.sort(key=lambda section: section[1])
+    return sections
+
+def _strip_span(text, start, end):
+    """Narrows text[start:end] to exclude leading and trailing whitespace, like str.strip()."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+def _section_span(text, sections, name):
+    """Returns the stripped (start, end) of the named section's body, or None if it has no heading."""
+    for section_name, start, end in sections:
+        if section_name == name:
+            return _strip_span(text, start, end)
+    return None
+
+def _section_text(text, sections, name):
+    """Returns the stripped body of the named section from _segment_sections output, or ""."""
+    span = _section_span(text, sections, name)
+    return text[span[0]:span[1]] if span else ""
+
+_BLANK_LINE_REGEX = re.compile(r'\n\s*\n')
+
+def _entry_spans(text, start, end):
+    """
+    Yields the (start, end) of each non-blank entry of text[start:end], where entries are
+    separated by blank lines (the spans of re.split(r'\n\s*\n', block.strip())).
+    """
+    start, end = _strip_span(text, start, end)
+    if start == end:
+        return
+    position = start
+    for separator in _BLANK_LINE_REGEX.finditer(text, start, end):
+        yield position, separator.start()
+        position = separator.end()
+    yield position, end
+
+def _first_lines(text, start, end, count):
+    """
+    Returns the spans of the first `count` lines of text[start:end], and the offset where the
+    remaining lines begin (None if the text has no more than `count` lines).
+    """
+    lines = []
+    position = start
+    for _ in range(count):
+        newline = text.find('\n', position, end)
+        if newline == -1:
+            lines.append((position, end))
+            return lines, None
+        lines.append((position, newline))
+        position = newline + 1
+    return lines, position
+
+# The section parsers take the resume text and the span of the section body, and return model
+# objects whose text fields are offsets into that text (see core/models.py).
+
+def _parse_experience(text, start=0, end=None):
     """Basic parsing of experience entries. Assumes chronological or distinct entries."""
     # This is highly heuristic. A more robust parser would use NLP to identify job titles, companies, dates.
     # For MVP, we'll split by common delimiters like multiple newlines or lines that look like date ranges / company names.
     # This is a placeholder for more sophisticated parsing logic.
-    if not text_block.strip(): return []
-    # Simplistic: assume each paragraph or double-newline separated block is an entry
-    entries = re.split(r'\n\s*\n', text_block.strip()) # Split by blank lines
+    end = len(text) if end is None else end
     parsed_entries = []
-    for entry in entries:
-        if not entry.strip(): continue
-        lines = entry.split('\n')
-        title = lines[0].strip() if lines else "Job Title"
-        company_dates = lines[1].strip() if len(lines) > 1 else "Company & Dates"
-        description = "\n".join(lines[2:]).strip() if len(lines) > 2 else "Description of responsibilities."
-        parsed_entries.append({
-            "title": title,
-            "company": company_dates, # Needs further splitting for company and dates ideally
-            "dates": "", # Placeholder, as splitting company_dates is complex
-            "description": description
-        })
-    if not parsed_entries and text_block: # Fallback if split didn't work
-        return [{'title': 'Experience Details', 'company': '', 'dates': '', 'description': text_block}]
+    # Simplistic: assume each paragraph or double-newline separated block is an entry
+    for entry_start, entry_end in _entry_spans(text, start, end):
+        lines, rest = _first_lines(text, entry_start, entry_end, 2)
+        parsed_entries.append(ExperienceEntry(
+            text,
+            title=_strip_span(text, *lines[0]),
+            company=_strip_span(text, *lines[1]) if len(lines) > 1 else "Company & Dates", # Needs further splitting for company and dates ideally
+            description=_strip_span(text, rest, entry_end) if rest is not None else "Description of responsibilities."
+        ))
     return parsed_entries
 
-def _parse_education(text_block):
-    if not text_block.strip(): return []
-    entries = re.split(r'\n\s*\n', text_block.strip()) 
+def _parse_education(text, start=0, end=None):
+    end = len(text) if end is None else end
     parsed_entries = []
-    for entry in entries:
-        if not entry.strip(): continue
-        lines = entry.split('\n')
-        degree = lines[0].strip() if lines else "Degree"
-        institution_dates = lines[1].strip() if len(lines) > 1 else "Institution & Dates"
-        details = "\n".join(lines[2:]).strip() if len(lines) > 2 else "Details about education."
-        parsed_entries.append({
-            "degree": degree,
-            "institution": institution_dates, # Needs further splitting
-            "dates": "", # Placeholder
-            "details": details
-        })
-    if not parsed_entries and text_block: # Fallback
-        return [{'degree': 'Education Details', 'institution': '', 'dates': '', 'details': text_block}]
+    for entry_start, entry_end in _entry_spans(text, start, end):
+        lines, rest = _first_lines(text, entry_start, entry_end, 2)
+        parsed_entries.append(EducationEntry(
+            text,
+            degree=_strip_span(text, *lines[0]),
+            institution=_strip_span(text, *lines[1]) if len(lines) > 1 else "Institution & Dates", # Needs further splitting
+            details=_strip_span(text, rest, entry_end) if rest is not None else "Details about education."
+        ))
     return parsed_entries
 
-def _parse_skills(text_block):
+def _parse_skills(text, start=0, end=None):
+    text_block = text[start:end]
     if not text_block.strip(): return []
     # Skills are often comma-separated, bullet points, or lines
     skills = re.split(r'[\n,;]|\s{2,}', text_block) # Split by newline, comma, semicolon, or multiple spaces
     return [skill.strip() for skill in skills if skill.strip() and len(skill.strip()) > 1]
 
-def _parse_projects(text_block):
-    if not text_block.strip(): return []
-    entries = re.split(r'\n\s*\n', text_block.strip())
+def _parse_projects(text, start=0, end=None):
+    end = len(text) if end is None else end
     parsed_entries = []
-    for entry in entries:
-        if not entry.strip(): continue
-        lines = entry.split('\n')
-        name = lines[0].strip() if lines else "Project Name"
-        description_tech = "\n".join(lines[1:]).strip() if len(lines) > 1 else "Description and technologies."
-        parsed_entries.append({
-            "name": name,
-            "description": description_tech, # Could be split further
-            "technologies": [], # Placeholder
-            "link": ""
-        })
-    if not parsed_entries and text_block: # Fallback
-        return [{'name': 'Project Details', 'description': text_block, 'technologies':[], 'link': ''}]
+    for entry_start, entry_end in _entry_spans(text, start, end):
+        lines, rest = _first_lines(text, entry_start, entry_end, 1)
+        parsed_entries.append(Project(
+            text,
+            name=_strip_span(text, *lines[0]),
+            description=_strip_span(text, rest, entry_end) if rest is not None else "Description and technologies." # Could be split further
+        ))
     return parsed_entries
 
-def parse_resume(file_path):
-    """Parses a resume file (PDF or DOCX) and extracts structured information."""
-    _, extension = os.path.splitext(file_path)
-    raw_text = ""
-
+def _parse_summary(text, start=0, end=None):
+    start, end = _strip_span(text, start, len(text) if end is None else end)
+    return (start, end) if start < end else "A brief professional summary about yourself."
+
+# Section parsers in the order parse_text runs them
+SECTION_PARSERS = {
+    "summary": _parse_summary,
+    "experience": _parse_experience,
+    "education": _parse_education,
+    "skills": _parse_skills,
+    "projects": _parse_projects,
+}
+
+def _rebase(parsed, source, delta):
+    """Moves a parsed section value (see SECTION_PARSERS) onto `source`, shifting its offsets by `delta`."""
+    if isinstance(parsed, tuple):
+        return (parsed[0] + delta, parsed[1] + delta)
+    if isinstance(parsed, list):
+        return [item.rebase(source, delta) if hasattr(item, "rebase") else item for item in parsed]
+    return parsed
+
+def extract_resume_text(file_path, filename=None, sandbox=None):
+    """
+    Extracts the raw text of a resume file (PDF or DOCX).
+
+    `file_path` may also be a seekable binary file object (e.g. an upload stream), in which case
+    `filename` must be given so the file type can be determined from its extension.
+
+    With a `sandbox` (a core.extraction_sandbox.ExtractionSandbox) the extraction runs in one of
+    its worker processes, and a document that fails, times out or exceeds the memory limit
+    raises ExtractionError instead of yielding an empty text.
+    """
+    _, extension = os.path.splitext(filename or file_path)
     if extension.lower() == '.pdf':
-        raw_text = _extract_text_from_pdf(file_path)
+        with stage_timer("extract_pdf"):
+            return sandbox.extract(file_path, extension) if sandbox else _extract_text_from_pdf(file_path)
     elif extension.lower() == '.docx':
-        raw_text = _extract_text_from_docx(file_path)
-    else:
-        raise ValueError("Unsupported file type. Only PDF and DOCX are supported.")
+        with stage_timer("extract_docx"):
+            return sandbox.extract(file_path, extension) if sandbox else _extract_text_from_docx(file_path)
+    raise ValueError("Unsupported file type. Only PDF and DOCX are supported.")
 
-    if not raw_text.strip():
-        return {"error": "Could not extract text from resume."}
+def name_candidate_text(raw_text):
+    """The header lines of a resume that the name is extracted from."""
+    # Consider the first few lines for name extraction to improve accuracy
+    return "\n".join(raw_text.split('\n')[:5])
 
-    # Basic data structure
-    parsed_data = {
-        "name": "Your Name",
-        "title": "Professional Title", # Default, can be hard to extract
-        "email": "your.email@example.com",
-        "phone": "",
-        "linkedin": "",
-        "github": "",
-        "website": "",
-        "summary": "",
-        "experience": [],
-        "education": [],
-        "skills": [],
-        "projects": [],
-        "profile_image_url": "https://images.unsplash.com/photo-1507003211169-0a1dd7228f2d?ixlib=rb-4.0.3&ixid=M3wxMjA3fDB8MHxwaG90by1wYWdlfHx8fGVufDB8fHx8fA%3D%3D&auto=format&fit=crop&w=387&q=80"
-    }
+def parse_text(raw_text, previous=None, name=None):
+    """
+    Extracts structured information from a resume's raw text.
+
+    Returns (resume, intermediates), where `resume` is a core.models.Resume whose text fields
+    are offsets into `raw_text` (use to_dict() for plain data). `intermediates` holds the header
+    lines, the extracted name and each section's text and parsed value; pass it back as
+    `previous` when parsing an edited version of the same text, and only the parts that changed
+    are recomputed: the name (spaCy) only if the header lines changed, each section parser only
+    if its text changed. The result is identical to a parse without `previous`.
+
+    A `name` skips name extraction altogether; batch callers pass the result of extract_names
+    for the text's name_candidate_text.
+    """
+    previous = previous or {}
+    resume = Resume(raw_text)
 
     # Attempt to extract name from the top part of the resume
-    # Consider the first few lines for name extraction to improve accuracy
-    name_candidate_text = "\n".join(raw_text.split('\n')[:5]) 
-    parsed_data["name"] = _extract_name(name_candidate_text)
+    header = name_candidate_text(raw_text)
+    name_reextracted = name is None and previous.get("header") != header
+    if name is not None:
+        resume.name = name
+    elif name_reextracted:
+        with stage_timer("extract_name"):
+            resume.name = _extract_name(header)
+    else:
+        resume.name = previous["name"]
 
     # Extract contact info from the whole text
-    contact_info = _extract_contact_info(raw_text)
-    parsed_data.update(contact_info)
-
-    # Define section keyword lists for ordered extraction
-    all_section_keywords = [
-        SUMMARY_KEYWORDS, EXPERIENCE_KEYWORDS, EDUCATION_KEYWORDS, SKILLS_KEYWORDS, PROJECTS_KEYWORDS
-    ]
-
-    # Extract Summary
-    summary_text = _find_section_content(raw_text, SUMMARY_KEYWORDS, [EXPERIENCE_KEYWORDS, EDUCATION_KEYWORDS, SKILLS_KEYWORDS, PROJECTS_KEYWORDS])
-    parsed_data["summary"] = summary_text.strip() if summary_text else "A brief professional summary about yourself."
-
-    # Extract Experience
-    experience_text = _find_section_content(raw_text, EXPERIENCE_KEYWORDS, [EDUCATION_KEYWORDS, SKILLS_KEYWORDS, PROJECTS_KEYWORDS])
-    parsed_data["experience"] = _parse_experience(experience_text)
-
-    # Extract Education
-    education_text = _find_section_content(raw_text, EDUCATION_KEYWORDS, [SKILLS_KEYWORDS, PROJECTS_KEYWORDS, EXPERIENCE_KEYWORDS]) # Experience might appear after education too
-    parsed_data["education"] = _parse_education(education_text)
-
-    # Extract Skills
-    skills_text = _find_section_content(raw_text, SKILLS_KEYWORDS, [PROJECTS_KEYWORDS, EXPERIENCE_KEYWORDS, EDUCATION_KEYWORDS])
-    parsed_data["skills"] = _parse_skills(skills_text)
-
-    # Extract Projects
-    projects_text = _find_section_content(raw_text, PROJECTS_KEYWORDS, [EXPERIENCE_KEYWORDS, EDUCATION_KEYWORDS, SKILLS_KEYWORDS]) # Check against other sections
-    parsed_data["projects"] = _parse_projects(projects_text)
-    
+    with stage_timer("extract_contact"):
+        contact_info = _extract_contact_info(raw_text)
+    for field, value in contact_info.items():
+        setattr(resume, field, value)
+
+    # Locate every section in one pass, then hand each parser its slice
+    with stage_timer("segment_sections"):
+        sections = _segment_sections(raw_text)
+
+    previous_sections = previous.get("sections", {})
+    section_results = {}
+    reparsed = []
+    with stage_timer("parse_sections"):
+        for name, parser in SECTION_PARSERS.items():
+            start, end = _section_span(raw_text, sections, name) or (0, 0)
+            section_text = raw_text[start:end]
+            cached = previous_sections.get(name)
+            if cached is not None and cached["text"] == section_text:
+                parsed = _rebase(cached["parsed"], raw_text, start - cached["start"])
+            else:
+                parsed = parser(raw_text, start, end)
+                reparsed.append(name)
+            section_results[name] = {"text": section_text, "start": start, "parsed": parsed}
+            setattr(resume, name, parsed)
+
     # A very basic attempt to get a 'title' (e.g., Software Engineer)
     # This could be the first line of the summary, or the first job title.
-    if parsed_data["experience"] and parsed_data["experience"][0]["title"] != "Job Title":
-        parsed_data["title"] = parsed_data["experience"][0]["title"]
-    elif parsed_data["summary"]:
-        first_summary_line = parsed_data["summary"].split('\n')[0].strip()
+    if resume.experience and resume.experience[0].title != "Job Title":
+        resume.title = resume.experience[0].title
+    elif resume.summary:
+        first_summary_line = resume.summary.split('\n')[0].strip()
         # If the first line is short and seems like a title
         if len(first_summary_line.split()) < 5 and first_summary_line:
-            parsed_data["title"] = first_summary_line
+            resume.title = first_summary_line
+
+    intermediates = {
+        "raw_text": raw_text,
+        "header": header,
+        "name": resume.name,
+        "spans": sections,
+        "sections": section_results,
+        "reparsed_sections": reparsed,
+        "name_reextracted": name_reextracted,
+    }
+    return resume, intermediates
+
+# Model class of each section parser's entries, for rebuilding them from JSON
+_SECTION_MODELS = {"experience": ExperienceEntry, "education": EducationEntry, "projects": Project}
+
+def intermediates_to_json(intermediates):
+    """
+    Returns the reusable parts of parse_text's intermediates as JSON-serializable data, so they
+    can be stored outside the process (e.g. a ResultCache disk tier). intermediates_from_json
+    turns them back into a `previous` for parse_text.
+    """
+    sections = {}
+    for name, section in intermediates["sections"].items():
+        parsed = section["parsed"]
+        if isinstance(parsed, tuple):
+            parsed = {"span": list(parsed)}
+        elif name in _SECTION_MODELS:
+            parsed = [entry.to_state() for entry in parsed]
+        sections[name] = {"text": section["text"], "start": section["start"], "parsed": parsed}
+    return {
+        "raw_text": intermediates["raw_text"],
+        "header": intermediates["header"],
+        "name": intermediates["name"],
+        "spans": [list(span) for span in intermediates["spans"]],
+        "sections": sections,
+    }
 
-    return parsed_data
+def intermediates_from_json(data):
+    """Inverse of intermediates_to_json."""
+    raw_text = data["raw_text"]
+    sections = {}
+    for name, section in data["sections"].items():
+        parsed = section["parsed"]
+        if isinstance(parsed, dict):
+            parsed = tuple(parsed["span"])
+        elif name in _SECTION_MODELS:
+            parsed = [_SECTION_MODELS[name].from_state(raw_text, state) for state in parsed]
+        sections[name] = {"text": section["text"], "start": section["start"], "parsed": parsed}
+    return {
+        "raw_text": raw_text,
+        "header": data["header"],
+        "name": data["name"],
+        "spans": [tuple(span) for span in data["spans"]],
+        "sections": sections,
+    }
+
+def replace_section_text(raw_text, spans, name, new_text):
+    """
+    Returns `raw_text` with the body of section `name` replaced by `new_text`.
+
+    `spans` is the _segment_sections output for `raw_text` (the "spans" intermediate). Raises
+    KeyError if the section has no heading in the text.
+    """
+    for section_name, start, end in spans:
+        if section_name == name:
+            return raw_text[:start] + "\n" + new_text.strip() + "\n" + raw_text[end:]
+    raise KeyError(name)
+
+def overlapping_sections(spans, names):
+    """
+    Returns, sorted, the sections among `names` whose span overlaps the span of another of them.
+
+    A section's body can hold sections that do not bound it (e.g. Summary inside Education, whose
+    boundaries don't include Summary). Replacing one of two overlapping sections moves the text
+    of the other, so they can't be replaced from the same spans.
+    """
+    chosen = [span for span in spans if span[0] in names]
+    return sorted({a[0] for a in chosen for b in chosen if a is not b and a[1] < b[2] and b[1] < a[2]})
+
+def parse_resume(file_path, filename=None, sandbox=None):
+    """
+    Parses a resume file (PDF or DOCX) and extracts structured information.
+
+    `file_path` may also be a seekable binary file object (e.g. an upload stream), in which case
+    `filename` must be given so the file type can be determined from its extension. `sandbox` is
+    passed to extract_resume_text.
+
+    Returns the core.models.Resume, or {"error": ...} if no text could be extracted.
+    """
+    raw_text = extract_resume_text(file_path, filename, sandbox=sandbox)
+    if not raw_text.strip():
+        return {"error": "Could not extract text from resume."}
+    resume, _ = parse_text(raw_text)
+    return resume
 
 # Example usage (for testing locally)
 # if __name__ == '__main__':
@@ -0,0 +1,221 @@
+"""
+Static asset serving for the React build.
+
+`StaticAssetMiddleware` wraps the Flask WSGI app and answers GET/HEAD requests for the built
+frontend before Flask's routing, request hooks and CORS handling run. The build directory is
+indexed once at startup, so no request touches the filesystem to find out whether a file exists.
+
+  * Precompressed `.br` / `.gz` siblings (see `precompress`) are served when the client accepts them.
+  * Content-hashed files (CRA's `static/js/main.3f2a1b9c.js`) get a one-year immutable Cache-Control;
+    everything else, index.html included, must be revalidated.
+  * Every response carries an ETag and Last-Modified, and conditional requests get 304.
+  * Extensionless paths that are not files fall back to index.html for client-side routing; a
+    missing file such as /favicon.ico or a bundle from an older build is left to the app (404).
+
+Files are sent with the server's wsgi.file_wrapper (sendfile under gunicorn) rather than read into
+Python. The index is not refreshed: restart the server after deploying a new build.
+
+Precompress a build (from the backend directory):
+    python -m core.static_assets ../frontend/build
+"""
+import datetime
+import gzip
+import mimetypes
+import os
+import re
+import sys
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from werkzeug.http import http_date, is_resource_modified
+from werkzeug.wrappers import Response
+from werkzeug.wsgi import wrap_file
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip siblings are generated
+    brotli = None
+
+# Matches the content hash CRA puts in built file names, e.g. main.3f2a1b9c.js or 787.1e4a5b2c.chunk.js
+HASHED_NAME_REGEX = re.compile(r"\.[0-9a-f]{8,}\.")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+# Encodings in order of preference, with the file suffix of their precompressed sibling
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+COMPRESSIBLE_EXTENSIONS = {'.html', '.js', '.css', '.json', '.map', '.svg', '.txt', '.ico', '.xml'}
+MIN_COMPRESS_SIZE = 1024
+
+
+class _Variant(NamedTuple):
+    path: str
+    size: int
+    etag: str
+
+
+class StaticAsset(NamedTuple):
+    content_type: str
+    cache_control: str
+    last_modified: float
+    # Content-Encoding ("" for identity) -> file to send
+    variants: Dict[str, _Variant]
+
+
+def _content_type(path: str) -> str:
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json'):
+        content_type += '; charset=utf-8'
+    return content_type
+
+
+def build_index(root: str) -> Dict[str, StaticAsset]:
+    """
+    Walks `root` once and returns {url path: StaticAsset} for every file in it.
+
+    `.br`/`.gz` files next to an original are registered as variants of it, not as assets.
+    """
+    index: Dict[str, StaticAsset] = {}
+    if not os.path.isdir(root):
+        return index
+    suffixes = tuple(suffix for _, suffix in ENCODINGS)
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if name.endswith(suffixes):
+                continue
+            path = os.path.join(dirpath, name)
+            stat = os.stat(path)
+            url_path = '/' + os.path.relpath(path, root).replace(os.sep, '/')
+            tag = f"{stat.st_size:x}-{int(stat.st_mtime):x}"
+            variants = {"": _Variant(path, stat.st_size, f'"{tag}"')}
+            for encoding, suffix in ENCODINGS:
+                compressed = path + suffix
+                # A sibling older than the original is stale; serve the original instead
+                if os.path.isfile(compressed) and os.path.getmtime(compressed) >= stat.st_mtime:
+                    variants[encoding] = _Variant(compressed, os.path.getsize(compressed), f'"{tag}-{encoding}"')
+            hashed = url_path.startswith('/static/') and HASHED_NAME_REGEX.search(name)
+            index[url_path] = StaticAsset(
+                content_type=_content_type(path),
+                cache_control=IMMUTABLE_CACHE_CONTROL if hashed else REVALIDATE_CACHE_CONTROL,
+                last_modified=stat.st_mtime,
+                variants=variants,
+            )
+    return index
+
+
+def is_client_route(path: str) -> bool:
+    """
+    True if `path` may be a client-side route, i.e. its last segment has no file extension.
+
+    Anything that looks like a file (favicon.ico, main.1a2b3c4d.js) is an asset request, and
+    answering a missing one with index.html would hand the browser HTML as a script or icon.
+    """
+    return not os.path.splitext(path.rstrip('/').rsplit('/', 1)[-1])[1]
+
+
+def _accepted_encodings(header: str) -> set:
+    """Returns the content codings an Accept-Encoding header allows (q > 0)."""
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        q = params.strip()
+        if q.startswith('q=') and q[2:].strip() in ('0', '0.0', '0.00', '0.000'):
+            continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _choose_variant(asset: StaticAsset, accept_encoding: str) -> Tuple[str, _Variant]:
+    if len(asset.variants) > 1 and accept_encoding:
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding, _ in ENCODINGS:
+            if encoding in asset.variants and (encoding in accepted or '*' in accepted):
+                return encoding, asset.variants[encoding]
+    return "", asset.variants[""]
+
+
+class StaticAssetMiddleware:
+    """
+    WSGI middleware serving the indexed build directory in front of `app`.
+
+    Requests under `passthrough` prefixes (the API), other methods than GET/HEAD, files missing
+    from the build, and any request when the build directory was missing at startup go straight
+    to `app`.
+    """
+
+    def __init__(self, app, root: str, passthrough=('/api/', '/metrics'), fallback: Optional[str] = '/index.html'):
+        self.app = app
+        self.root = root
+        self.passthrough = tuple(passthrough)
+        self.index = build_index(root)
+        self.fallback = self.index.get(fallback) if fallback else None
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO') or '/'
+        if environ.get('REQUEST_METHOD') not in ('GET', 'HEAD') or path.startswith(self.passthrough):
+            return self.app(environ, start_response)
+        asset = self.index.get(path) or (self.index.get(path.rstrip('/') + '/index.html') if path.endswith('/') else None)
+        if asset is None and is_client_route(path):
+            asset = self.fallback
+        if asset is None:
+            return self.app(environ, start_response)
+        return self._serve(asset, environ, start_response)
+
+    def _serve(self, asset: StaticAsset, environ, start_response):
+        encoding, variant = _choose_variant(asset, environ.get('HTTP_ACCEPT_ENCODING', ''))
+        headers = [
+            ('Cache-Control', asset.cache_control),
+            ('ETag', variant.etag),
+            ('Last-Modified', http_date(asset.last_modified)),
+        ]
+        if len(asset.variants) > 1:
+            headers.append(('Vary', 'Accept-Encoding'))
+
+        last_modified = datetime.datetime.fromtimestamp(int(asset.last_modified), datetime.timezone.utc)
+        if not is_resource_modified(environ, etag=variant.etag.strip('"'), last_modified=last_modified):
+            return Response(status=304, headers=headers)(environ, start_response)
+
+        headers += [('Content-Type', asset.content_type), ('Content-Length', str(variant.size))]
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+        if environ.get('REQUEST_METHOD') == 'HEAD':
+            body = []
+        else:
+            body = wrap_file(environ, open(variant.path, 'rb'))
+        start_response('200 OK', headers)
+        return body
+
+
+def precompress(root: str, min_size: int = MIN_COMPRESS_SIZE) -> int:
+    """
+    Writes `.gz` (and, with the brotli package installed, `.br`) siblings for the text assets
+    under `root` that don't have an up-to-date one yet. Returns the number of files written.
+    """
+    written = 0
+    suffixes = tuple(suffix for _, suffix in ENCODINGS)
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            if name.endswith(suffixes) or os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            if os.path.getsize(path) < min_size:
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            compressors = [('.gz', lambda d: gzip.compress(d, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                compressors.append(('.br', lambda d: brotli.compress(d, quality=11)))
+            for suffix, compress in compressors:
+                target = path + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                    continue
+                compressed = compress(data)
+                if len(compressed) >= len(data):
+                    continue  # Not worth serving
+                with open(target, 'wb') as f:
+                    f.write(compressed)
+                written += 1
+    return written
+
+
+if __name__ == '__main__':
+    build_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join('..', 'frontend', 'build')
+    print(f"Precompressed {precompress(build_dir)} file(s) in {build_dir}")
@@ -0,0 +1,58 @@
+import os
+import threading
+import time
+from typing import Optional
+
+
+class UploadReaper:
+    """
+    Background thread that deletes stale files from the upload folder.
+
+    Uploads are normally processed from memory, but large ones spill to uniquely named temporary
+    files in `folder`, and a crashed worker can leave those behind. Every `interval` seconds the
+    reaper removes regular files whose modification time is older than `max_age` seconds.
+    """
+
+    def __init__(self, folder: str, max_age: float = 3600, interval: float = 300):
+        self.folder = folder
+        self.max_age = max_age
+        self.interval = interval
+        self.removed = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sweep(self) -> int:
+        """Removes stale files once and returns how many were deleted."""
+        cutoff = time.time() - self.max_age
+        removed = 0
+        try:
+            entries = list(os.scandir(self.folder))
+        except OSError as e:
+            print(f"Error listing upload folder {self.folder}: {e}")
+            return 0
+        for entry in entries:
+            try:
+                if entry.is_file(follow_symlinks=False) and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError:
+                # Already removed by its owner, or still held open on a platform that forbids it
+                continue
+        self.removed += removed
+        return removed
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sweep()
+
+    def start(self) -> None:
+        """Starts the reaper thread (no-op if it is already running in this process)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="upload-reaper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Signals the reaper thread to exit after its current sweep."""
+        self._stop.set()
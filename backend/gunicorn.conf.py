@@ -0,0 +1,55 @@
+"""
+Gunicorn configuration for production serving.
+
+Run from the project root (as startup.sh does):
+    gunicorn --config backend/gunicorn.conf.py
+
+The app is imported once in the master before workers fork (preload_app), so the spaCy pipeline
+and the compiled Jinja templates are loaded a single time and shared copy-on-write. Every setting
+can be overridden with the environment variables below or on the gunicorn command line.
+"""
+import multiprocessing
+import os
+
+# Import `app:app` from the backend directory while keeping the working directory (and with it the
+# relative uploads/ folder) where the server was started, as with `python backend/app.py`.
+pythonpath = os.path.dirname(os.path.abspath(__file__))
+wsgi_app = 'app:app'
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', 9000)}")
+
+# Load spaCy and Jinja in the master; workers inherit them instead of loading their own copies
+preload_app = True
+
+# Parsing is CPU-bound, so one worker process per core does the real work. Threads per worker
+# (gthread) keep cheap requests (readiness, /metrics, job polling) responsive while a thread is
+# busy parsing. The app's admission control caps uploads being processed at
+# ADMISSION_MAX_IN_FLIGHT per worker, so the remaining threads mostly answer excess uploads with
+# a quick 503 instead of letting them queue inside gunicorn.
+#
+# Each worker also runs its own small pools: EXTRACTION_WORKERS sandbox processes (default 2),
+# which the JOB_WORKERS job threads and BATCH_WORKERS batch threads share. They are fixed sizes
+# rather than one per core, which would multiply to cores^2 processes across the workers. Job
+# status lives in JOB_STATE_DIR, so any worker can answer a poll for a job another one accepted.
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# Recycle workers after a number of requests to contain memory growth from pdfminer; the jitter
+# stops all workers from restarting at the same moment.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 500))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 50))
+
+# Large PDFs can take a while to parse synchronously in /api/upload_resume
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    server.log.info(f"Serving with {workers} {worker_class} worker(s) x {threads} thread(s), "
+                    f"recycling every {max_requests} (+{max_requests_jitter}) requests")
@@ -23,10 +23,16 @@ npm install
 echo "Building frontend application (npm run build)..."
 npm run build
 
+# Write .gz (and .br, if the brotli package is installed) copies of the build for the static layer
+echo "Precompressing frontend build..."
+(cd ../backend && python -m core.static_assets ../frontend/build)
+
 # Navigate back to the project root directory
 echo "Navigating back to project root..."
 cd ..
 
 # Start the backend server
+# gunicorn preloads the app (spaCy, templates) once and forks one worker per core; see
+# backend/gunicorn.conf.py for the settings. Use `python backend/app.py` for the debug server.
 echo "Starting backend server on port 9000..."
-python backend/app.py
+exec gunicorn --config backend/gunicorn.conf.py